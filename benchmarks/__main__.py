@@ -0,0 +1,112 @@
+"""
+Benchmark entry point: python -m benchmarks [options]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks.suites import DEFAULT_SIZES, SUITES
+from benchmarks.timing import compare, format_duration, measure, measure_peak_memory
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Micro-benchmarks do caminho de avaliação e do histórico."
+    )
+    parser.add_argument(
+        '--suite', action='append', choices=sorted(SUITES),
+        help="Suíte a executar (pode ser repetido; padrão: todas)"
+    )
+    parser.add_argument(
+        '--sizes', default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Tamanhos de histórico separados por vírgula (padrão: 100 até 1000000)"
+    )
+    parser.add_argument(
+        '--filter', default="",
+        help="Executa apenas os benchmarks cujo nome contém este texto"
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help="Rodadas cronometradas por benchmark (padrão: 5)"
+    )
+    parser.add_argument(
+        '--memory', action='store_true',
+        help="Também mede o pico de memória alocada por chamada (tracemalloc)"
+    )
+    parser.add_argument(
+        '--output',
+        help="Arquivo JSON onde os resultados são salvos"
+    )
+    parser.add_argument(
+        '--compare', metavar='BASELINE',
+        help="Arquivo JSON de uma execução anterior para detectar regressões"
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.10,
+        help="Lentidão relativa tolerada na comparação (padrão: 0.10 = 10%%)"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    """Run the selected suites, then save and compare the results."""
+    args = build_parser().parse_args(argv)
+    try:
+        sizes = sorted({int(size) for size in args.sizes.split(",") if size.strip()})
+        if not sizes or min(sizes) < 1:
+            raise ValueError
+    except ValueError:
+        print(f"Erro: tamanhos inválidos: {args.sizes}", file=sys.stderr)
+        return 2
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for suite in args.suite or list(SUITES):
+        for name, func, operations in SUITES[suite](sizes):
+            if args.filter not in name:
+                continue
+            timings = measure(func, operations, args.repeat)
+            line = (f"{name:<55} {format_duration(timings['median_ns']):>12}/op"
+                    f"  (±{format_duration(timings['stdev_ns'])})")
+            if args.memory:
+                timings.update(measure_peak_memory(func, operations))
+                line += f"  pico {timings['peak_bytes']:,} B"
+            results[name] = timings
+            print(line, flush=True)
+
+    if args.output:
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'repeat': args.repeat,
+                'sizes': sizes
+            },
+            'results': results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSÃO {name}: {format_duration(before)} -> {format_duration(after)} "
+                  f"({(ratio - 1) * 100:+.1f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"Nenhuma regressão acima de {args.threshold:.0%}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
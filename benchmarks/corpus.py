@@ -0,0 +1,147 @@
+"""
+Benchmark corpus - realistic and adversarial calculator expressions.
+Following Single Responsibility Principle - only generates benchmark inputs.
+"""
+import random
+from typing import Dict, List
+
+# Symbols as typed on the keypad (display) and as evaluated
+DISPLAY_OPERATORS = ['+', '−', '×', '÷']
+OPERATORS = ['+', '-', '*', '/']
+
+
+def _random_number(rng: random.Random) -> str:
+    """A keypad-style number: mostly small integers, some decimals."""
+    if rng.random() < 0.7:
+        return str(rng.randint(0, 9999))
+    return f"{rng.randint(0, 999)}.{rng.randint(0, 99)}"
+
+
+def realistic_expressions(count: int = 1000, seed: int = 42) -> List[str]:
+    """
+    Generate short expressions like the ones typed in the GUI.
+
+    Args:
+        count: Number of expressions
+        seed: Random seed (the corpus is deterministic for a given seed)
+
+    Returns:
+        List of expressions using evaluation symbols
+    """
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        terms = [_random_number(rng) for _ in range(rng.randint(2, 6))]
+        expression = terms[0]
+        for term in terms[1:]:
+            expression += rng.choice(OPERATORS) + term
+        if rng.random() < 0.2:
+            expression = f"({expression})*{_random_number(rng)}"
+        expressions.append(expression)
+    return expressions
+
+
+def display_expressions(expressions: List[str]) -> List[str]:
+    """Rewrite expressions with the display symbols (×, ÷, −)."""
+    table = str.maketrans(dict(zip(OPERATORS, DISPLAY_OPERATORS)))
+    return [expression.translate(table) for expression in expressions]
+
+
+def adversarial_expressions() -> Dict[str, str]:
+    """
+    Expressions that stress the parser, the evaluator and the formatter.
+
+    Returns:
+        Mapping of a short case name to its expression
+    """
+    return {
+        'long_chain': "+".join(str(i) for i in range(1, 10001)),
+        'long_mixed_chain': "".join(f"{i}{OPERATORS[i % 4]}" for i in range(1, 5001)) + "1",
+        'deep_parentheses': "(" * 1000 + "1+2" + ")" * 1000,
+        'nested_products': "(1+" * 500 + "1" + ")*2" * 500,
+        'unary_run': "-" * 1000 + "7",
+        'long_literal': "9" * 4000,
+        'long_decimal': "0." + "3" * 2000 + "*3",
+        'power_tower': "2**2**2**2",
+        'huge_result': "9" * 300 + "*" + "9" * 300,
+        'division_by_zero': "1/(5-5)",
+        'invalid_tail': "1+2+" * 1000,
+    }
+
+
+def oversized_expressions() -> Dict[str, str]:
+    """
+    Expressions whose results are too large to compute in reasonable time.
+
+    The cost estimator must reject every one of them before evaluating it.
+
+    Returns:
+        Mapping of a short case name to its expression
+    """
+    return {
+        'power_chain': "9**9**9",
+        'power_tower': "2**2**2**2**2**2",
+        'literal_power': "99999999**99999999",
+        'nested_powers': "((2**1000)**1000)**1000",
+        'squaring_parentheses': "(" * 1000 + "2" + ")**2" * 1000,
+        'large_products': "*".join(["10**400000"] * 3),
+        'division_of_powers': "10**2000000//7**500000",
+        'negative_base': "(-3)**3**17",
+    }
+
+
+def oversized_fraction_expressions() -> Dict[str, str]:
+    """
+    Expressions cheap with floats or Decimals but too large as exact fractions.
+
+    The cost estimator must reject every one of them in the 'fraction'
+    arithmetic mode, and accept them in the others.
+
+    Returns:
+        Mapping of a short case name to its expression
+    """
+    return {
+        'fraction_power': "(1/3)**1000000",
+        'fraction_power_chain': "(2/3)**9**9",
+        'decimal_literal_power': "1.5**10000000",
+        'negative_power': "7**-1000000",
+    }
+
+
+def affordable_powers() -> Dict[str, str]:
+    """
+    Powers the cost estimator must accept in every arithmetic mode.
+
+    Returns:
+        Mapping of a short case name to its expression
+    """
+    return {
+        'power_of_two': "2**1000",
+        'power_tower': "2**2**2**2",
+        'fraction_power': "(1/3)**100",
+        'decimal_literal_power': "1.5**20",
+        'negative_power': "7**-20",
+        'division_of_powers': "10**1000//7**300",
+        'negative_base': "(-3)**3**5",
+    }
+
+
+def long_numbers(count: int = 1000, seed: int = 7) -> List[str]:
+    """
+    Generate result strings of varied lengths for truncate_long_number.
+
+    Args:
+        count: Number of strings
+        seed: Random seed
+
+    Returns:
+        List of integer and decimal number strings, some over 15 characters
+    """
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(count):
+        digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 40)))
+        if rng.random() < 0.3:
+            digits = digits[:len(digits) // 2 + 1] + "." + digits[len(digits) // 2 + 1:] + "1"
+        numbers.append(digits.lstrip("0") or "0")
+    return numbers
@@ -0,0 +1,112 @@
+"""
+Cost estimator check: oversized expressions must be rejected, the rest accepted.
+Run with: python -m benchmarks.cost_check [options]
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional
+from benchmarks.corpus import (
+    adversarial_expressions, affordable_powers, oversized_expressions,
+    oversized_fraction_expressions, realistic_expressions
+)
+from services.expression_evaluator import (
+    ARITHMETIC_MODES, FRACTION_ARITHMETIC, ExpressionEvaluator, InvalidExpressionError
+)
+from utils.cost_estimator import ExpressionTooCostlyError
+from utils.formatters import ExpressionValidator
+
+# Cheap cases the estimator may still refuse: its bound on a sum of fractions
+# multiplies the denominators, which is only reached when they are coprime
+CONSERVATIVE_REJECTIONS = {
+    FRACTION_ARITHMETIC: {'adversarial.long_mixed_chain'},
+}
+
+
+def expected_rejections(arithmetic: str) -> Dict[str, str]:
+    """Cases the estimator must reject in an arithmetic mode."""
+    cases = dict(oversized_expressions())
+    if arithmetic == FRACTION_ARITHMETIC:
+        cases.update((f"fraction.{case}", expression)
+                     for case, expression in oversized_fraction_expressions().items())
+    return cases
+
+
+def expected_acceptances(arithmetic: str) -> Dict[str, str]:
+    """Cases the estimator must accept in an arithmetic mode."""
+    cases = {f"realistic.{index}": expression
+             for index, expression in enumerate(realistic_expressions())}
+    cases.update((f"adversarial.{case}", expression)
+                 for case, expression in adversarial_expressions().items())
+    cases.update((f"powers.{case}", expression)
+                 for case, expression in affordable_powers().items())
+    if arithmetic != FRACTION_ARITHMETIC:
+        cases.update((f"fraction.{case}", expression)
+                     for case, expression in oversized_fraction_expressions().items())
+    return cases
+
+
+def rejection(evaluator: ExpressionEvaluator, expression: str) -> Optional[str]:
+    """
+    Run the cost estimate of an expression, without evaluating it.
+
+    Returns:
+        The rejection message, or None if the expression is accepted
+        (invalid expressions count as accepted: the parser rejects them)
+    """
+    try:
+        tree = evaluator.parse(ExpressionValidator.sanitize_expression(expression))
+        evaluator.cost_estimator.check(tree)
+    except ExpressionTooCostlyError as e:
+        return str(e)
+    except InvalidExpressionError:
+        pass
+    return None
+
+
+def check_mode(arithmetic: str) -> List[str]:
+    """
+    Check the estimator's verdict on the whole corpus in one arithmetic mode.
+
+    Returns:
+        One message per wrong verdict (refusing a case in
+        CONSERVATIVE_REJECTIONS is not wrong)
+    """
+    evaluator = ExpressionEvaluator(arithmetic, compiled_cache_size=0)
+    failures = []
+    for case, expression in expected_rejections(arithmetic).items():
+        if rejection(evaluator, expression) is None:
+            failures.append(f"{arithmetic}: {case} foi aceita, mas deveria ser recusada")
+    tolerated = CONSERVATIVE_REJECTIONS.get(arithmetic, set())
+    for case, expression in expected_acceptances(arithmetic).items():
+        message = rejection(evaluator, expression)
+        if message is not None and case in tolerated:
+            print(f"{arithmetic}: {case} recusada por uma estimativa conservadora ({message})")
+        elif message is not None:
+            failures.append(f"{arithmetic}: {case} foi recusada ({message})")
+    return failures
+
+
+def main(argv=None) -> int:
+    """Check every selected mode; the exit status is 1 if any verdict is wrong."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.cost_check",
+        description="Confere a estimativa de custo com o corpus de expressões adversariais."
+    )
+    parser.add_argument('--arithmetic', choices=ARITHMETIC_MODES, action='append',
+                        help="Modo aritmético (pode ser repetido; padrão: todos)")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for arithmetic in args.arithmetic or ARITHMETIC_MODES:
+        failures = check_mode(arithmetic)
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        checked = len(expected_rejections(arithmetic)) + len(expected_acceptances(arithmetic))
+        print(f"{arithmetic}: {checked} casos, {len(failures)} veredito(s) errado(s)")
+        if failures:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+History stress test: several processes adding to one shared history file.
+Run with: python -m benchmarks.history_stress [options]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from services.history_manager import HistoryManager
+from services.journal_history_manager import JournalHistoryManager
+
+BACKENDS = ('json', 'journal')
+
+
+def create_manager(backend: str, history_file: str, max_entries: int,
+                   write_behind: bool = False) -> HistoryManager:
+    """Create a history manager of the given backend that keeps max_entries."""
+    if backend == 'journal':
+        manager = JournalHistoryManager(history_file, legacy_file=None, compaction_factor=1,
+                                        write_behind=write_behind, autoload=False)
+    else:
+        manager = HistoryManager(history_file, write_behind=write_behind, autoload=False)
+    manager.set_max_entries(max_entries)
+    manager.load_history()
+    return manager
+
+
+def add_entries(backend: str, history_file: str, worker: int, entries: int,
+                max_entries: int, write_behind: bool) -> None:
+    """Worker process: add `entries` distinct calculations, then flush."""
+    manager = create_manager(backend, history_file, max_entries, write_behind)
+    for index in range(entries):
+        manager.add_calculation(f"{worker}×{index}", str(worker * index))
+    manager.close()
+
+
+def run_stress(backend: str, processes: int, entries: int,
+               write_behind: bool) -> dict:
+    """
+    Run the worker processes against one file and check that no entry was lost.
+
+    Returns:
+        Elapsed seconds and the number of lost and duplicated entries
+    """
+    import multiprocessing
+
+    total = processes * entries
+    with tempfile.TemporaryDirectory() as directory:
+        history_file = os.path.join(directory, f"history.{'ndjson' if backend == 'journal' else 'json'}")
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=add_entries,
+                            args=(backend, history_file, worker, entries, total, write_behind))
+            for worker in range(processes)
+        ]
+        started = time.perf_counter()
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for process in workers if process.exitcode != 0)
+
+        counts = Counter(entry.expression for entry in
+                         create_manager(backend, history_file, total).get_history())
+    expected = {f"{worker}×{index}" for worker in range(processes) for index in range(entries)}
+    return {
+        'elapsed': elapsed,
+        'lost': len(expected - counts.keys()),
+        'duplicated': sum(count - 1 for count in counts.values() if count > 1),
+        'failed_processes': failed
+    }
+
+
+def main(argv=None) -> int:
+    """Run the stress test and report; the exit status is 1 if any entry was lost."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.history_stress",
+        description="Vários processos gravando no mesmo arquivo de histórico."
+    )
+    parser.add_argument('--backend', choices=BACKENDS, action='append',
+                        help="Formato do histórico (pode ser repetido; padrão: todos)")
+    parser.add_argument('--processes', type=int, default=8,
+                        help="Processos gravando ao mesmo tempo (padrão: 8)")
+    parser.add_argument('--entries', type=int, default=2000,
+                        help="Cálculos adicionados por processo (padrão: 2000)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Grava a cada cálculo, em vez de agrupar as gravações em segundo plano")
+    args = parser.parse_args(argv)
+    if args.processes < 1 or args.entries < 1:
+        print("Erro: --processes e --entries devem ser maiores que zero", file=sys.stderr)
+        return 2
+
+    status = 0
+    for backend in args.backend or BACKENDS:
+        report = run_stress(backend, args.processes, args.entries, not args.sync)
+        total = args.processes * args.entries
+        print(
+            f"{backend}: {args.processes} processos × {args.entries} cálculos em "
+            f"{report['elapsed']:.2f} s ({total / report['elapsed']:.0f} cálculos/s); "
+            f"perdidos: {report['lost']}, duplicados: {report['duplicated']}"
+        )
+        if report['lost'] or report['duplicated'] or report['failed_processes']:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Benchmark suites for the evaluation hot path and the history storage.
+Following Single Responsibility Principle - only defines what is measured.
+
+Each suite is a generator yielding (name, callable, operations) tuples.
+The runner times each callable while the generator is suspended, so the
+state a suite sets up stays valid until it is measured.
+"""
+import json
+import os
+import tempfile
+from typing import Callable, Iterator, List, Sequence, Tuple
+from benchmarks.corpus import (
+    adversarial_expressions, display_expressions, long_numbers, oversized_expressions, realistic_expressions
+)
+from cli.batch import calculate_expression
+from models.calculation_entry import CalculationEntry
+from services.calculation_service import CalculationService
+from services.expression_evaluator import ExpressionEvaluator
+from services.history_manager import HistoryManager
+from services.journal_history_manager import JournalHistoryManager
+from utils.formatters import ExpressionValidator, NumberFormatter
+
+# (benchmark name, callable to time, operations performed per call)
+Benchmark = Tuple[str, Callable[[], object], int]
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+SEARCH_QUERIES = ('7', '123', '+45', 'zzz')
+
+
+def formatter_benchmarks(sizes: Sequence[int]) -> Iterator[Benchmark]:
+    """ExpressionValidator and NumberFormatter on the realistic and adversarial corpus."""
+    realistic = realistic_expressions()
+    displayed = display_expressions(realistic)
+    adversarial = list(adversarial_expressions().values())
+    results: List[object] = [7, 2.5, 1 / 3, 1e20, 12345678.0, -0.1, "abc", 10 ** 12]
+    numbers = long_numbers()
+
+    def each(func, items):
+        # Results are dropped so the memory peak reflects a single call
+        def run():
+            for item in items:
+                func(item)
+        return run
+
+    yield 'validator.is_valid_expression.realistic', each(ExpressionValidator.is_valid_expression, realistic), len(realistic)
+    yield 'validator.is_valid_expression.adversarial', each(ExpressionValidator.is_valid_expression, adversarial), len(adversarial)
+    yield 'validator.tokenize.realistic', each(ExpressionValidator.tokenize, realistic), len(realistic)
+    yield 'validator.sanitize_expression', each(ExpressionValidator.sanitize_expression, displayed), len(displayed)
+    yield 'validator.sanitize_expressions.bulk', lambda: ExpressionValidator.sanitize_expressions(displayed), len(displayed)
+    yield 'validator.format_for_display', each(ExpressionValidator.format_for_display, realistic), len(realistic)
+    yield 'validator.format_expressions_for_display.bulk', lambda: ExpressionValidator.format_expressions_for_display(realistic), len(realistic)
+    tokenized = [ExpressionValidator.tokenize(expression) for expression in realistic]
+    yield 'validator.format_tokens_for_display', each(ExpressionValidator.format_tokens_for_display, tokenized), len(tokenized)
+    yield 'formatter.format_result', each(NumberFormatter.format_result, results), len(results)
+    yield 'formatter.truncate_long_number', each(NumberFormatter.truncate_long_number, numbers), len(numbers)
+
+
+def evaluation_benchmarks(sizes: Sequence[int]) -> Iterator[Benchmark]:
+    """The calculation step of bt_equal, uncached, cached and with the history."""
+    realistic = realistic_expressions()
+    displayed = display_expressions(realistic)
+
+    uncached = CalculationService(ExpressionEvaluator(compiled_cache_size=0), cache_size=0)
+    yield 'evaluate.realistic', lambda: [calculate_expression(uncached, e) for e in displayed], len(displayed)
+
+    # Result cache off: every call is evaluated, but from the compiled form
+    compiled = CalculationService(ExpressionEvaluator(compiled_cache_size=len(displayed)), cache_size=0)
+    yield 'evaluate.realistic.compiled', lambda: [calculate_expression(compiled, e) for e in displayed], len(displayed)
+
+    cached = CalculationService(cache_size=len(displayed))
+    yield 'evaluate.realistic.cached', lambda: [calculate_expression(cached, e) for e in displayed], len(displayed)
+
+    for case, expression in adversarial_expressions().items():
+        yield f'evaluate.adversarial.{case}', lambda e=expression: calculate_expression(uncached, e), 1
+
+    # Rejected by the cost estimator: the time measured is the estimate itself
+    for case, expression in oversized_expressions().items():
+        if calculate_expression(uncached, expression)[2]:
+            raise RuntimeError(f"oversized expression was evaluated: {case}")
+        yield f'evaluate.oversized.{case}', lambda e=expression: calculate_expression(uncached, e), 1
+
+    # Everything bt_equal does, with the history configured as in main.py
+    with tempfile.TemporaryDirectory() as directory:
+        history = JournalHistoryManager(
+            os.path.join(directory, "history.ndjson"), legacy_file=None,
+            write_behind=True, autoload=False
+        )
+
+        def equal(expression):
+            try:
+                tokens = ExpressionValidator.tokenize(ExpressionValidator.sanitize_expression(expression))
+                result = uncached.calculate_tokens(tokens)
+            except (ValueError, ArithmeticError):
+                return
+            history.add_calculation(ExpressionValidator.format_tokens_for_display(tokens), result)
+
+        try:
+            yield 'bt_equal.realistic', lambda: [equal(e) for e in displayed], len(displayed)
+        finally:
+            history.close()
+
+
+def _write_history_files(directory: str, entries: List[CalculationEntry]) -> Tuple[str, str]:
+    """Write the entries as a JSON history and as an NDJSON journal."""
+    json_file = os.path.join(directory, f"history_{len(entries)}.json")
+    journal_file = os.path.join(directory, f"history_{len(entries)}.ndjson")
+    records = [entry.to_dict() for entry in entries]
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+    with open(journal_file, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return json_file, journal_file
+
+
+def history_benchmarks(sizes: Sequence[int]) -> Iterator[Benchmark]:
+    """HistoryManager and JournalHistoryManager load/save/add/search per history size."""
+    corpus = display_expressions(realistic_expressions(max(sizes)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            entries = [CalculationEntry(expression, str(i)) for i, expression in enumerate(corpus[:size])]
+            json_file, journal_file = _write_history_files(directory, entries)
+            del entries
+
+            for kind, create_manager in (
+                ('json', lambda: HistoryManager(json_file, autoload=False)),
+                ('journal', lambda: JournalHistoryManager(journal_file, legacy_file=None, autoload=False)),
+            ):
+                manager = create_manager()
+                manager.set_max_entries(size)
+                yield f'history.{kind}.load[n={size}]', manager.load_history, 1
+
+                if kind == 'journal':
+                    # The search index is shared by every backend: measure it once
+                    yield (f'history.search[n={size}]',
+                           lambda m=manager: [m.search_history(q) for q in SEARCH_QUERIES],
+                           len(SEARCH_QUERIES))
+
+                yield f'history.{kind}.save[n={size}]', manager.save_history, 1
+                yield (f'history.{kind}.add[n={size}]',
+                       lambda m=manager: m.add_calculation("12×34−5", "403"), 1)
+                manager.close()
+                del manager
+
+
+SUITES = {
+    'formatters': formatter_benchmarks,
+    'evaluation': evaluation_benchmarks,
+    'history': history_benchmarks,
+}
@@ -0,0 +1,95 @@
+"""
+Benchmark timing and comparison helpers.
+Following Single Responsibility Principle - only measures and compares timings.
+"""
+import statistics
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+
+def measure(func: Callable[[], object], operations: int = 1, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time a callable, auto-scaling the loop count like `python -m timeit`.
+
+    The first autorange pass doubles as a warm-up (caches, lazy imports).
+
+    Args:
+        func: Callable to time (no arguments)
+        operations: Operations performed by one call, used to report per-operation times
+        repeat: Number of timed rounds
+
+    Returns:
+        Per-operation timings in nanoseconds plus the loop parameters
+    """
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    rounds = timer.repeat(repeat=repeat, number=loops)
+    per_operation = [elapsed / loops / operations * 1e9 for elapsed in rounds]
+    return {
+        'median_ns': statistics.median(per_operation),
+        'min_ns': min(per_operation),
+        'stdev_ns': statistics.stdev(per_operation) if len(per_operation) > 1 else 0.0,
+        'loops': loops,
+        'repeat': repeat,
+        'operations': operations
+    }
+
+
+def measure_peak_memory(func: Callable[[], object], operations: int = 1) -> Dict[str, float]:
+    """
+    Measure the memory a call allocates at its peak, with tracemalloc.
+
+    Temporary objects (intermediate strings, per-call dicts) show up here
+    even when they are freed before the call returns.
+
+    Args:
+        func: Callable to measure (no arguments)
+        operations: Operations performed by one call
+
+    Returns:
+        Peak bytes allocated by one call and per operation
+    """
+    func()  # warm-up: lazy imports and caches are not counted
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes': peak, 'peak_bytes_per_op': peak / operations}
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict],
+            threshold: float) -> List[Tuple[str, float, float, float]]:
+    """
+    Compare two result sets by median time per operation.
+
+    Args:
+        baseline: Benchmark name -> timings of the reference run
+        current: Benchmark name -> timings of this run
+        threshold: Allowed relative slowdown (0.10 = 10 %)
+
+    Returns:
+        (name, baseline ns, current ns, ratio) for every benchmark slower
+        than the baseline by more than the threshold
+    """
+    regressions = []
+    for name, timings in current.items():
+        reference = baseline.get(name)
+        if not reference or reference['median_ns'] <= 0:
+            continue
+        ratio = timings['median_ns'] / reference['median_ns']
+        if ratio > 1 + threshold:
+            regressions.append((name, reference['median_ns'], timings['median_ns'], ratio))
+    return regressions
+
+
+def format_duration(nanoseconds: float) -> str:
+    """Format a duration with a readable unit."""
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.2f} {unit}"
+    return f"{nanoseconds:.0f} ns"
@@ -0,0 +1,173 @@
+"""
+Command line entry point: python -m cli <command> [options]
+"""
+import argparse
+import sys
+from cli import batch, loadtest, serve, table
+from services import calculator_server
+from services.expression_evaluator import ARITHMETIC_MODES, FLOAT_ARITHMETIC
+from utils.formatters import DEFAULT_PRECISION
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one sub-command per headless mode."""
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Calculadora sem interface gráfica."
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = commands.add_parser(
+        'batch',
+        help="Avalia uma expressão por linha de um arquivo ou da entrada padrão"
+    )
+    batch_parser.add_argument(
+        'input', nargs='?', default='-',
+        help="Arquivo de expressões ('-' ou omitido para a entrada padrão)"
+    )
+    batch_parser.add_argument(
+        '--cache-size', type=int, default=256,
+        help="Número máximo de resultados memorizados (0 desativa o cache)"
+    )
+    batch_parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Número de processos de avaliação (padrão: 1, no próprio processo)"
+    )
+    batch_parser.add_argument(
+        '--chunk-size', type=int, default=1000,
+        help="Expressões enviadas a cada processo por tarefa (padrão: 1000)"
+    )
+    batch_parser.add_argument(
+        '--arithmetic', choices=ARITHMETIC_MODES, default=FLOAT_ARITHMETIC,
+        help="Aritmética da divisão e dos decimais: float (padrão), decimal ou fraction "
+             "(exata); inteiros são sempre exatos"
+    )
+    batch_parser.add_argument(
+        '--precision', type=int, default=DEFAULT_PRECISION,
+        help=f"Dígitos significativos nos modos decimal e fraction (padrão: {DEFAULT_PRECISION})"
+    )
+    batch_parser.add_argument(
+        '--throughput', action='store_true',
+        help="Exibe na saída de erro o total processado e a vazão (expr/s)"
+    )
+    batch_parser.set_defaults(handler=batch.main)
+
+    table_parser = commands.add_parser(
+        'table',
+        help="Avalia uma expressão com variável para vários valores (requer NumPy)"
+    )
+    table_parser.add_argument(
+        'expression',
+        help="Expressão com a variável, por exemplo \"x*1.075+3\""
+    )
+    table_parser.add_argument(
+        '--variable', default='x',
+        help="Nome da variável (padrão: x)"
+    )
+    values_group = table_parser.add_mutually_exclusive_group(required=True)
+    values_group.add_argument(
+        '--range',
+        help="Intervalo 'início:fim[:passo]', com o fim incluído (passo padrão: 1)"
+    )
+    values_group.add_argument(
+        '--values',
+        help="Arquivo com um valor por linha ('-' para a entrada padrão)"
+    )
+    table_parser.set_defaults(handler=table.main)
+
+    serve_parser = commands.add_parser(
+        'serve',
+        help="Serve a calculadora via JSON por linha (TCP ou socket Unix)"
+    )
+    _add_address_arguments(serve_parser)
+    serve_parser.add_argument(
+        '--history-dir',
+        help="Pasta dos históricos por sessão (sem ela, as sessões ficam desativadas)"
+    )
+    serve_parser.add_argument(
+        '--cache-size', type=int, default=256,
+        help="Número máximo de resultados memorizados (0 desativa o cache)"
+    )
+    serve_parser.add_argument(
+        '--arithmetic', choices=ARITHMETIC_MODES, default=FLOAT_ARITHMETIC,
+        help="Aritmética da divisão e dos decimais: float (padrão), decimal ou fraction"
+    )
+    serve_parser.add_argument(
+        '--precision', type=int, default=DEFAULT_PRECISION,
+        help=f"Dígitos significativos nos modos decimal e fraction (padrão: {DEFAULT_PRECISION})"
+    )
+    serve_parser.add_argument(
+        '--max-connections', type=int, default=calculator_server.DEFAULT_MAX_CONNECTIONS,
+        help=f"Conexões atendidas ao mesmo tempo (padrão: {calculator_server.DEFAULT_MAX_CONNECTIONS})"
+    )
+    serve_parser.add_argument(
+        '--max-pipeline', type=int, default=calculator_server.DEFAULT_MAX_PIPELINE,
+        help="Requisições sem resposta por conexão antes de parar de lê-la "
+             f"(padrão: {calculator_server.DEFAULT_MAX_PIPELINE})"
+    )
+    serve_parser.add_argument(
+        '--max-pending', type=int, default=calculator_server.DEFAULT_MAX_PENDING,
+        help="Cálculos na fila antes de parar de ler todas as conexões "
+             f"(padrão: {calculator_server.DEFAULT_MAX_PENDING})"
+    )
+    serve_parser.add_argument(
+        '--max-batch-size', type=int, default=calculator_server.DEFAULT_MAX_BATCH_SIZE,
+        help=f"Cálculos avaliados por lote (padrão: {calculator_server.DEFAULT_MAX_BATCH_SIZE})"
+    )
+    serve_parser.add_argument(
+        '--batch-delay', type=float, default=calculator_server.DEFAULT_BATCH_DELAY * 1000,
+        help="Milissegundos que um lote espera por mais requisições (padrão: 0, "
+             "só as que já chegaram)"
+    )
+    serve_parser.set_defaults(handler=serve.main)
+
+    loadtest_parser = commands.add_parser(
+        'loadtest',
+        help="Mede latência (p50/p99) e vazão de um servidor em execução"
+    )
+    _add_address_arguments(loadtest_parser)
+    loadtest_parser.add_argument(
+        '--requests', type=int, default=10000,
+        help="Total de requisições (padrão: 10000)"
+    )
+    loadtest_parser.add_argument(
+        '--connections', type=int, default=8,
+        help="Conexões simultâneas (padrão: 8)"
+    )
+    loadtest_parser.add_argument(
+        '--pipeline', type=int, default=16,
+        help="Requisições sem resposta por conexão (padrão: 16)"
+    )
+    loadtest_parser.add_argument(
+        '--input',
+        help="Arquivo de expressões, repetidas até o total (padrão: expressões geradas, todas distintas)"
+    )
+    loadtest_parser.set_defaults(handler=loadtest.main)
+
+    return parser
+
+
+def _add_address_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the server address options shared by 'serve' and 'loadtest'."""
+    parser.add_argument(
+        '--host', default=calculator_server.DEFAULT_HOST,
+        help=f"Endereço TCP (padrão: {calculator_server.DEFAULT_HOST})"
+    )
+    parser.add_argument(
+        '--port', type=int, default=calculator_server.DEFAULT_PORT,
+        help=f"Porta TCP (padrão: {calculator_server.DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        '--unix',
+        help="Caminho de um socket Unix, no lugar de TCP"
+    )
+
+
+def main(argv=None) -> int:
+    """Parse the command line and run the selected command."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
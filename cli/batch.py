@@ -0,0 +1,262 @@
+"""
+Batch evaluation - streams expressions from a file or stdin to stdout.
+Following Single Responsibility Principle - only handles headless batch runs.
+"""
+import sys
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from services.calculation_service import CalculationService
+from services.expression_evaluator import (
+    FLOAT_ARITHMETIC, ExpressionEvaluator, ExpressionTooCostlyError, InvalidExpressionError
+)
+from utils.formatters import DEFAULT_PRECISION, ExpressionValidator
+from utils.metrics import metrics
+
+ERROR_PREFIX = "Erro: "
+
+# (expression, result or error message, succeeded)
+BatchResult = Tuple[str, str, bool]
+
+# Calculation pipeline of the current worker process (see _init_worker)
+_worker_service: Optional[CalculationService] = None
+
+
+def read_expressions(stream: TextIO) -> Iterator[str]:
+    """
+    Yield one expression per non-blank line of a text stream.
+
+    Args:
+        stream: Open text stream to read from
+
+    Returns:
+        Iterator over the expressions, without line terminators
+    """
+    for line in stream:
+        expression = line.strip()
+        if expression:
+            yield expression
+
+
+def calculate_expression(service: CalculationService, expression: str) -> BatchResult:
+    """
+    Calculate a single expression, turning calculation errors into messages.
+
+    Args:
+        service: Calculation pipeline to use
+        expression: The expression to calculate
+
+    Returns:
+        Tuple of expression, result (or error message) and success flag
+    """
+    try:
+        return expression, service.calculate(expression), True
+    except InvalidExpressionError:
+        return expression, "Expressão inválida!", False
+    except ExpressionTooCostlyError as e:
+        return expression, str(e), False
+    except ZeroDivisionError:
+        return expression, "Divisão por zero!", False
+    except Exception as e:
+        return expression, f"Erro no cálculo: {str(e)}", False
+
+
+def evaluate_expressions(expressions: Iterable[str],
+                         service: CalculationService) -> Iterator[BatchResult]:
+    """
+    Lazily calculate every expression of an iterable.
+
+    Args:
+        expressions: Expressions to calculate
+        service: Calculation pipeline to use
+
+    Returns:
+        Iterator over the batch results, in input order
+    """
+    for expression in expressions:
+        yield calculate_expression(service, expression)
+
+
+def chunk_expressions(expressions: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """
+    Group expressions into lists of at most chunk_size items.
+
+    Args:
+        expressions: Expressions to group
+        chunk_size: Maximum number of expressions per chunk
+
+    Returns:
+        Iterator over the chunks, in input order
+    """
+    iterator = iter(expressions)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def create_service(cache_size: int = 256, arithmetic: str = FLOAT_ARITHMETIC,
+                   precision: int = DEFAULT_PRECISION) -> CalculationService:
+    """
+    Create the calculation pipeline of a batch run.
+
+    Args:
+        cache_size: Size of the result cache
+        arithmetic: Arithmetic mode of the evaluator ('float', 'decimal' or 'fraction')
+        precision: Significant digits of Decimal/Fraction results
+
+    Returns:
+        A new calculation service
+    """
+    return CalculationService(ExpressionEvaluator(arithmetic, precision), cache_size)
+
+
+def _init_worker(cache_size: int, arithmetic: str, precision: int) -> None:
+    """Create the calculation pipeline reused by every chunk of a worker."""
+    global _worker_service
+    _worker_service = create_service(cache_size, arithmetic, precision)
+    # What a worker records is returned with each chunk and saved by the parent
+    metrics.output_file = None
+    metrics.reset()
+
+
+def _calculate_chunk(chunk: List[str]) -> Tuple[List[Tuple[str, bool]], Optional[Dict[str, Any]]]:
+    """Calculate a chunk in a worker, returning only (result, succeeded) pairs and the metrics."""
+    # One translation for the whole chunk; calculate() then finds nothing to sanitize
+    sanitized_chunk = ExpressionValidator.sanitize_expressions(chunk)
+    results = [calculate_expression(_worker_service, expression)[1:] for expression in sanitized_chunk]
+    return results, metrics.take()
+
+
+def evaluate_expressions_parallel(expressions: Iterable[str], workers: int,
+                                  chunk_size: int = 1000,
+                                  cache_size: int = 256,
+                                  arithmetic: str = FLOAT_ARITHMETIC,
+                                  precision: int = DEFAULT_PRECISION) -> Iterator[BatchResult]:
+    """
+    Calculate expressions in a process pool, yielding results in input order.
+
+    Only a bounded number of chunks is in flight at any time, so memory
+    stays constant no matter how long the input is.
+
+    Args:
+        expressions: Expressions to calculate
+        workers: Number of worker processes
+        chunk_size: Expressions sent to a worker per task
+        cache_size: Size of the result cache of each worker
+        arithmetic: Arithmetic mode of the evaluator
+        precision: Significant digits of Decimal/Fraction results
+
+    Returns:
+        Iterator over the batch results, in input order
+    """
+    # Imported here: multiprocessing is costly to import and rarely needed
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_size, arithmetic, precision)) as executor:
+        pending: Deque = deque()
+        for chunk in chunk_expressions(expressions, chunk_size):
+            pending.append((chunk, executor.submit(_calculate_chunk, chunk)))
+            if len(pending) >= max_in_flight:
+                yield from _collect_chunk(*pending.popleft())
+        while pending:
+            yield from _collect_chunk(*pending.popleft())
+
+
+def _collect_chunk(chunk: List[str], future) -> Iterator[BatchResult]:
+    """Pair a finished chunk's results back with its expressions."""
+    results, recorded = future.result()
+    metrics.merge(recorded)
+    for expression, (result, succeeded) in zip(chunk, results):
+        yield expression, result, succeeded
+
+
+def format_results(results: Iterable[BatchResult]) -> Iterator[str]:
+    """
+    Format batch results as tab-separated output lines.
+
+    Args:
+        results: Batch results to format
+
+    Returns:
+        Iterator over 'expression<TAB>result' lines
+    """
+    for expression, result, succeeded in results:
+        if succeeded:
+            yield f"{expression}\t{result}\n"
+        else:
+            yield f"{expression}\t{ERROR_PREFIX}{result}\n"
+
+
+def run_batch(input_stream: TextIO, output_stream: TextIO,
+              cache_size: int = 256, workers: int = 1,
+              chunk_size: int = 1000, arithmetic: str = FLOAT_ARITHMETIC,
+              precision: int = DEFAULT_PRECISION) -> Tuple[int, int]:
+    """
+    Stream every expression of the input to the output.
+
+    Args:
+        input_stream: Stream with one expression per line
+        output_stream: Stream receiving the tab-separated results
+        cache_size: Size of the result cache (per worker process)
+        workers: Number of worker processes (1 calculates in this process)
+        chunk_size: Expressions sent to a worker per task
+        arithmetic: Arithmetic mode of the evaluator
+        precision: Significant digits of Decimal/Fraction results
+
+    Returns:
+        Tuple of the number of expressions processed and of failures
+    """
+    total = 0
+    failures = 0
+
+    def track_results(results: Iterable[BatchResult]) -> Iterator[BatchResult]:
+        nonlocal total, failures
+        for batch_result in results:
+            total += 1
+            if not batch_result[2]:
+                failures += 1
+            yield batch_result
+
+    expressions = read_expressions(input_stream)
+    if workers > 1:
+        results = evaluate_expressions_parallel(expressions, workers, chunk_size, cache_size,
+                                                arithmetic, precision)
+    else:
+        results = evaluate_expressions(expressions, create_service(cache_size, arithmetic, precision))
+
+    output_stream.writelines(format_results(track_results(results)))
+    output_stream.flush()
+    return total, failures
+
+
+def main(args) -> int:
+    """Entry point of the 'batch' command; returns the exit status."""
+    if args.workers < 1 or args.chunk_size < 1 or args.precision < 1:
+        print("Erro: --workers, --chunk-size e --precision devem ser maiores que zero",
+              file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    if args.input == '-':
+        total, failures = run_batch(sys.stdin, sys.stdout, args.cache_size, args.workers,
+                                    args.chunk_size, args.arithmetic, args.precision)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as input_stream:
+            total, failures = run_batch(input_stream, sys.stdout, args.cache_size, args.workers,
+                                        args.chunk_size, args.arithmetic, args.precision)
+    elapsed = time.perf_counter() - started
+
+    if args.throughput:
+        rate = total / elapsed if elapsed > 0 else 0.0
+        print(
+            f"{total} expressões em {elapsed:.3f} s "
+            f"({rate:.0f} expr/s, {args.workers} processo(s), {failures} erro(s))",
+            file=sys.stderr
+        )
+
+    return 1 if failures else 0
@@ -0,0 +1,151 @@
+"""
+Load test - measures the latency and throughput of a running calculator server.
+Following Single Responsibility Principle - only generates load and reports its timings.
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import deque
+from itertools import cycle, islice
+from typing import Deque, Dict, List, Optional, Sequence
+from cli.batch import read_expressions
+from services.calculator_server import encode_message
+
+
+def generate_expressions(count: int) -> List[str]:
+    """
+    Build distinct, realistic expressions (distinct so the result cache is missed).
+
+    Args:
+        count: Number of expressions
+
+    Returns:
+        The expressions
+    """
+    return [f"({i}+{i % 97}.5)*{i % 13 + 1}-{i % 7}/3" for i in range(count)]
+
+
+async def _open(host: str, port: int, unix_path: Optional[str]):
+    """Open a connection to the server."""
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _run_connection(host: str, port: int, unix_path: Optional[str],
+                          expressions: Sequence[str], pipeline: int,
+                          latencies: List[float]) -> int:
+    """
+    Send expressions over one connection, keeping up to `pipeline` unanswered.
+
+    Returns:
+        Number of error responses
+    """
+    reader, writer = await _open(host, port, unix_path)
+    in_flight = asyncio.Semaphore(pipeline)
+    sent_at: Deque[float] = deque()  # responses arrive in request order
+    errors = 0
+
+    async def send() -> None:
+        for request_id, expression in enumerate(expressions):
+            await in_flight.acquire()
+            sent_at.append(time.perf_counter())
+            writer.write(encode_message({'id': request_id, 'expression': expression}))
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    try:
+        for _ in range(len(expressions)):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("o servidor fechou a conexão")
+            latencies.append(time.perf_counter() - sent_at.popleft())
+            in_flight.release()
+            if not json.loads(line).get('ok'):
+                errors += 1
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return errors
+
+
+async def run_load_test(expressions: Sequence[str], connections: int, pipeline: int,
+                        host: str = '127.0.0.1', port: int = 8765,
+                        unix_path: Optional[str] = None) -> Dict[str, float]:
+    """
+    Send every expression to the server, spread over concurrent connections.
+
+    Args:
+        expressions: Expressions to send (split evenly between connections)
+        connections: Number of concurrent connections
+        pipeline: Unanswered requests allowed per connection
+        host: Server host (TCP)
+        port: Server port (TCP)
+        unix_path: Server Unix socket, instead of TCP
+
+    Returns:
+        Request count, errors, elapsed seconds, throughput and latency
+        percentiles in seconds
+    """
+    latencies: List[float] = []
+    shares = [expressions[index::connections] for index in range(connections)]
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _run_connection(host, port, unix_path, share, pipeline, latencies)
+        for share in shares if share
+    ))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 \
+        else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50': percentiles[49],
+        'p99': percentiles[98],
+        'max': max(latencies)
+    }
+
+
+def format_report(report: Dict[str, float], connections: int, pipeline: int) -> str:
+    """Format a load test report for the terminal."""
+    return (
+        f"{report['requests']} requisições em {report['elapsed']:.3f} s "
+        f"({report['throughput']:.0f} req/s, {connections} conexão(ões), "
+        f"pipeline {pipeline}, {report['errors']} erro(s))\n"
+        f"latência: p50 {report['p50'] * 1000:.3f} ms, p99 {report['p99'] * 1000:.3f} ms, "
+        f"máx {report['max'] * 1000:.3f} ms"
+    )
+
+
+def main(args) -> int:
+    """Entry point of the 'loadtest' command; returns the exit status."""
+    if args.requests < 1 or args.connections < 1 or args.pipeline < 1:
+        print("Erro: --requests, --connections e --pipeline devem ser maiores que zero",
+              file=sys.stderr)
+        return 2
+
+    if args.input is None:
+        expressions = generate_expressions(args.requests)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as input_stream:
+            expressions = list(read_expressions(input_stream))
+        if not expressions:
+            print("Erro: o arquivo não tem expressões", file=sys.stderr)
+            return 2
+        expressions = list(islice(cycle(expressions), args.requests))
+
+    try:
+        report = asyncio.run(run_load_test(expressions, args.connections, args.pipeline,
+                                           args.host, args.port, args.unix))
+    except (OSError, ConnectionError) as e:
+        print(f"Erro: falha na conexão com o servidor: {e}", file=sys.stderr)
+        return 1
+
+    print(format_report(report, args.connections, args.pipeline))
+    return 1 if report['errors'] else 0
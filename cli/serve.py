@@ -0,0 +1,56 @@
+"""
+Calculator service - runs the calculation engine as a local network server.
+Following Single Responsibility Principle - only handles the 'serve' command.
+"""
+import asyncio
+import sys
+from cli.batch import create_service
+from services.calculator_server import CalculatorServer
+
+
+async def run_server(server: CalculatorServer, host: str, port: int, unix_path=None) -> None:
+    """
+    Start the server, announce its address on stderr and serve until cancelled.
+
+    Args:
+        server: The server to run
+        host: Interface to listen on (TCP)
+        port: Port to listen on (TCP)
+        unix_path: Unix socket to listen on instead of TCP
+    """
+    await server.start(host, port, unix_path)
+    try:
+        for address in server.addresses:
+            where = address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+            print(f"Servindo em {where} (Ctrl+C encerra)", file=sys.stderr)
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(args) -> int:
+    """Entry point of the 'serve' command; returns the exit status."""
+    limits = (args.max_connections, args.max_pipeline, args.max_pending,
+              args.max_batch_size, args.precision)
+    if min(limits) < 1 or args.batch_delay < 0:
+        print("Erro: os limites e --precision devem ser maiores que zero "
+              "e --batch-delay não pode ser negativo", file=sys.stderr)
+        return 2
+
+    server = CalculatorServer(
+        create_service(args.cache_size, args.arithmetic, args.precision),
+        history_dir=args.history_dir,
+        max_connections=args.max_connections,
+        max_pipeline=args.max_pipeline,
+        max_pending=args.max_pending,
+        max_batch_size=args.max_batch_size,
+        batch_delay=args.batch_delay / 1000
+    )
+    try:
+        asyncio.run(run_server(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Erro: não foi possível abrir o servidor: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,73 @@
+"""
+Table evaluation - sweeps one expression over a range or a list of values.
+Following Single Responsibility Principle - only handles the 'table' command.
+"""
+import sys
+from typing import Iterator, TextIO, Tuple
+from cli.batch import ERROR_PREFIX
+from services.expression_evaluator import InvalidExpressionError
+from services.table_evaluator import DIVISION_BY_ZERO_MESSAGE, TableEvaluator
+from utils.formatters import NumberFormatter
+
+
+def parse_range(spec: str) -> Tuple[float, float, float]:
+    """
+    Parse a 'start:stop[:step]' range specification.
+
+    Args:
+        spec: The range specification (stop is inclusive, step defaults to 1)
+
+    Returns:
+        Tuple of start, stop and step
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    parts = spec.split(':')
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Intervalo inválido: {spec}")
+    start, stop = float(parts[0]), float(parts[1])
+    step = float(parts[2]) if len(parts) == 3 else 1.0
+    return start, stop, step
+
+
+def read_values(stream: TextIO) -> Iterator[float]:
+    """Yield one number per non-blank line of a text stream."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield float(line)
+
+
+def main(args) -> int:
+    """Entry point of the 'table' command; returns the exit status."""
+    try:
+        table = TableEvaluator(args.expression, args.variable)
+
+        if args.range:
+            values = table.build_range(*parse_range(args.range))
+        elif args.values == '-':
+            values = list(read_values(sys.stdin))
+        else:
+            with open(args.values, 'r', encoding='utf-8') as values_file:
+                values = list(read_values(values_file))
+    except ImportError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    except InvalidExpressionError:
+        print("Erro: Expressão inválida!", file=sys.stderr)
+        return 2
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+
+    results, errors = table.evaluate(values)
+    formatted_inputs = NumberFormatter.format_results(values)
+    formatted_results = NumberFormatter.format_results(results)
+    formatted_results[errors] = ERROR_PREFIX + DIVISION_BY_ZERO_MESSAGE
+
+    sys.stdout.writelines(
+        f"{value}\t{result}\n" for value, result in zip(formatted_inputs, formatted_results)
+    )
+    sys.stdout.flush()
+    return 1 if errors.any() else 0
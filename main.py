@@ -1,8 +1,13 @@
+import sys
+import time
 from tkinter import *
-from tkinter import font, messagebox
-from services.history_manager import HistoryManager
-from ui.history_window import HistoryWindow
-from utils.formatters import ExpressionValidator, NumberFormatter
+from tkinter import font
+from services.evaluation_worker import DEFAULT_TIMEOUT, EvaluationTimeoutError, EvaluationWorker
+from services.expression_evaluator import ExpressionTooCostlyError, InvalidExpressionError
+from services.journal_history_manager import JournalHistoryManager
+from utils.formatters import ExpressionValidator
+from utils.metrics import metrics
+from utils.startup_profiler import StartupProfiler, profile_startup
 
 # Configuration constants
 WINDOW_WIDTH = 400
@@ -11,6 +16,7 @@ MARGIN_SIZE = 12
 BUTTON_SPACING = 3
 BUTTON_HEIGHT = 2
 FONT_SIZE = 14
+POLL_INTERVAL_MS = 20  # How often a running calculation is checked
 
 # Color scheme - Gray and Blue only
 COLORS = {
@@ -55,32 +61,17 @@ def create_button(parent, text, bg_color, active_color, command, row, column, co
         command=command
     ).grid(row=row, column=column, columnspan=columnspan, padx=BUTTON_SPACING, pady=BUTTON_SPACING, sticky='nsew')
 
-# Create main window
-# Create root window
-win = Tk()
-win.title("Modern Calculator")
-# Make the root background white for visible margin around the calculator
-win.configure(bg='white')
-win.resizable(1, 1)
-win.minsize(350 + MARGIN_SIZE * 2, 500 + MARGIN_SIZE * 2)
-
-# Set initial size but don't center yet
-win.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
-
-# Container frame to create a visible margin around the calculator
-container = Frame(
-    win,
-    bg=COLORS['bg_main'],
-    padx=MARGIN_SIZE,
-    pady=MARGIN_SIZE,
-    # draw a visible border around the calculator so the margin stands out
-    highlightthickness=2,
-    highlightbackground='#cccccc'
-)
-container.pack(fill=BOTH, expand=True)
-
-# Initialize history manager
-history_manager = HistoryManager()
+# Application state, created by main() so importing this module stays GUI-free
+win = None
+input_text = None
+history_manager = None
+evaluation_worker = None
+pending_poll = None  # after() id of the next check of a running calculation
+equal_pressed_at = 0.0  # perf_counter() when "=" started the running calculation
+expression = ""
+
+# Records startup phases when launched by --profile-startup (no-op otherwise)
+profiler = StartupProfiler.from_environment()
 
 ###################Starting with functions ####################
 # 'btn_click' function : 
@@ -89,6 +80,9 @@ history_manager = HistoryManager()
 
 def btn_click(item):
     global expression
+    if evaluation_worker.busy:
+        # The display shows the running calculation; only "C" is accepted
+        return
     expression = expression + str(item)
     input_text.set(expression)
 
@@ -96,7 +90,12 @@ def btn_click(item):
 # the input field
 
 def bt_clear(): 
-    global expression 
+    global expression, pending_poll
+    if pending_poll is not None:
+        # Cancel the running calculation (its worker process is killed)
+        win.after_cancel(pending_poll)
+        pending_poll = None
+        evaluation_worker.cancel()
     expression = "" 
     input_text.set("")
  
@@ -104,37 +103,76 @@ def bt_clear():
 # present in input field
  
 def bt_equal():
-    global expression
+    global pending_poll, equal_pressed_at
+    if evaluation_worker.busy:
+        return
+    equal_pressed_at = time.perf_counter()
     try:
-        # Validate expression before evaluation
-        if not ExpressionValidator.is_valid_expression(expression):
-            messagebox.showerror("Erro", "Expressão inválida!")
+        # Scan the expression once: the tokens are evaluated and shown in the history
+        with metrics.time('sanitize'):
+            sanitized_expr = ExpressionValidator.sanitize_expression(expression)
+        with metrics.time('tokenize'):
+            tokens = ExpressionValidator.tokenize(sanitized_expr)
+    except InvalidExpressionError:
+        metrics.count('errors', type=InvalidExpressionError.__name__)
+        show_error("Expressão inválida!")
+        return
+    
+    # Calculate in the worker process (validated while parsing, memoized per
+    # expression) so a huge calculation cannot freeze the window
+    evaluation_worker.submit(tokens)
+    pending_poll = win.after(POLL_INTERVAL_MS, poll_result, tokens)
+
+def poll_result(tokens, waiting=False):
+    """Check the running calculation and show its result once it is ready."""
+    global expression, pending_poll
+    pending_poll = None
+    try:
+        formatted_result = evaluation_worker.poll()
+        if formatted_result is None:
+            # Still running: "C" cancels it, the timeout stops it
+            if not waiting:
+                input_text.set("Calculando…")
+            pending_poll = win.after(POLL_INTERVAL_MS, poll_result, tokens, True)
             return
         
-        # Sanitize expression for evaluation
-        sanitized_expr = ExpressionValidator.sanitize_expression(expression)
-        
-        # Calculate result
-        result = eval(sanitized_expr)
-        formatted_result = NumberFormatter.format_result(result)
-        
         # Add to history before clearing
-        display_expr = ExpressionValidator.format_for_display(expression)
+        with metrics.time('format_for_display'):
+            display_expr = ExpressionValidator.format_tokens_for_display(tokens)
         history_manager.add_calculation(display_expr, formatted_result)
         
         # Update display
         input_text.set(formatted_result)
         expression = ""
+        # From "=" to the result on the display, worker and polling included
+        metrics.observe('equal', time.perf_counter() - equal_pressed_at)
         
+    except InvalidExpressionError:
+        input_text.set(expression)
+        show_error("Expressão inválida!")
+    except ExpressionTooCostlyError as e:
+        input_text.set(expression)
+        show_error(str(e))
     except ZeroDivisionError:
-        messagebox.showerror("Erro", "Divisão por zero!")
+        show_error("Divisão por zero!")
+        bt_clear()
+    except EvaluationTimeoutError as e:
+        show_error(str(e))
         bt_clear()
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro no cálculo: {str(e)}")
+        show_error(f"Erro no cálculo: {str(e)}")
         bt_clear()
 
+def show_error(message):
+    """Show an error dialog (messagebox is only imported when needed)."""
+    from tkinter import messagebox
+    messagebox.showerror("Erro", message)
+
 def show_history():
     """Show the calculation history window."""
+    # Imported on first use so it does not slow down startup
+    from ui.history_window import HistoryWindow
+    
     history_entries = history_manager.get_history()
     
     def on_select_result(result):
@@ -151,139 +189,244 @@ def show_history():
         win, 
         history_entries, 
         on_select_result, 
-        on_clear_history
+        on_clear_history,
+        history_manager.search_history
     )
     history_window.show()
 
+def on_close():
+    """Write any pending history entries and stop the worker before closing the window."""
+    history_manager.close()
+    evaluation_worker.close()
+    win.destroy()
+
 def insert_from_history():
     """Insert the last calculation result into current expression."""
     last_calculation = history_manager.get_last_calculation()
     if last_calculation:
         btn_click(last_calculation.result)
     else:
+        from tkinter import messagebox
         messagebox.showinfo("Informação", "Não há histórico disponível.")
- 
-expression = ""
- 
-# 'StringVar()' :It is used to get the instance of input field
- 
-input_text = StringVar()
-
-# Create toolbar frame for history buttons
-toolbar_frame = Frame(container, bg=COLORS['bg_main'], width=WINDOW_WIDTH)
-# Set toolbar to WINDOW_WIDTH and buttons will fill this width
-toolbar_frame.pack(side=TOP, pady=(5, 0), fill=X)
-
-# Create history buttons in toolbar with consistent styling and proper width
-history_btn = Button(
-    toolbar_frame,
-    text="📚 Histórico",
-    command=show_history,
-    bg=COLORS['bg_clear'],
-    fg=COLORS['fg_text'],
-    font=('Segoe UI', 10, 'bold'),
-    relief='raised',
-    cursor='hand2',
-    activebackground=COLORS['active_clear'],
-    activeforeground=COLORS['fg_text'],
-    bd=2,
-    height=1,
-    width=18
-)
-history_btn.pack(side=LEFT, fill=X, expand=True, padx=(10, BUTTON_SPACING//2), pady=2)
-
-last_btn = Button(
-    toolbar_frame,
-    text="⏮️ Último",
-    command=insert_from_history,
-    bg=COLORS['bg_clear'],
-    fg=COLORS['fg_text'],
-    font=('Segoe UI', 10, 'bold'),
-    relief='raised',
-    cursor='hand2',
-    activebackground=COLORS['active_clear'],
-    activeforeground=COLORS['fg_text'],
-    bd=2,
-    height=1,
-    width=18
-)
-last_btn.pack(side=RIGHT, fill=X, expand=True, padx=(BUTTON_SPACING//2, 10), pady=2)
- 
-# Let us creating a frame for the input field
- 
-input_frame = Frame(container, width=WINDOW_WIDTH, height=80, bd=0, highlightbackground="#333333",
- highlightcolor=COLORS['border_input'], highlightthickness=2, bg=COLORS['bg_input'])
- 
-input_frame.pack(side=TOP, pady=5, fill=X)
- 
-#Let us create a input field inside the 'Frame'
- 
-input_field = Entry(input_frame, font=('Segoe UI', 20, 'bold'), 
-textvariable=input_text, width=WINDOW_WIDTH,bg=COLORS['bg_input'], bd=0, justify=RIGHT,
-fg=COLORS['fg_text'], insertbackground=COLORS['border_input'])
- 
-input_field.grid(row=0, column=0)
- 
-input_field.pack(ipady=15, padx=10)
 
- 
-btns_frame = Frame(container, width=WINDOW_WIDTH, height=400, bg=COLORS['bg_frame'])
- 
-btns_frame.pack(pady=5, fill=X)
+def build_toolbar(container):
+    """Create the toolbar with the history buttons."""
+    # Create toolbar frame for history buttons
+    toolbar_frame = Frame(container, bg=COLORS['bg_main'], width=WINDOW_WIDTH)
+    # Set toolbar to WINDOW_WIDTH and buttons will fill this width
+    toolbar_frame.pack(side=TOP, pady=(5, 0), fill=X)
 
-# Configure grid weights for responsive design
-for i in range(4):
-    btns_frame.grid_columnconfigure(i, weight=1)
-for i in range(5):  # Back to 5 rows for standard calculator layout
-    btns_frame.grid_rowconfigure(i, weight=1)
- 
-# Create all buttons using the standardized function
-# Row 0
-create_button(btns_frame, "C", COLORS['bg_clear'], COLORS['active_clear'], 
-              lambda: bt_clear(), 0, 0, columnspan=3, width=23)
-create_button(btns_frame, "÷", COLORS['bg_operator'], COLORS['active_operator'], 
-              lambda: btn_click("/"), 0, 3)
-
-# Row 1  
-create_button(btns_frame, "7", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(7), 1, 0)
-create_button(btns_frame, "8", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(8), 1, 1)
-create_button(btns_frame, "9", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(9), 1, 2)
-create_button(btns_frame, "×", COLORS['bg_operator'], COLORS['active_operator'], 
-              lambda: btn_click("*"), 1, 3)
-
-# Row 2
-create_button(btns_frame, "4", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(4), 2, 0)
-create_button(btns_frame, "5", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(5), 2, 1)
-create_button(btns_frame, "6", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(6), 2, 2)
-create_button(btns_frame, "−", COLORS['bg_operator'], COLORS['active_operator'], 
-              lambda: btn_click("-"), 2, 3)
-
-# Row 3
-create_button(btns_frame, "1", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(1), 3, 0)
-create_button(btns_frame, "2", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(2), 3, 1)
-create_button(btns_frame, "3", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(3), 3, 2)
-create_button(btns_frame, "+", COLORS['bg_operator'], COLORS['active_operator'], 
-              lambda: btn_click("+"), 3, 3)
-
-# Row 4
-create_button(btns_frame, "0", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click(0), 4, 0, columnspan=2, width=16)
-create_button(btns_frame, ".", COLORS['bg_number'], COLORS['active_number'], 
-              lambda: btn_click("."), 4, 2)
-create_button(btns_frame, "=", COLORS['bg_equals'], COLORS['active_equals'], 
-              lambda: bt_equal(), 4, 3)
-
-# Update the window to calculate final size, then center it
-win.update_idletasks()
-center_window(win, WINDOW_WIDTH, WINDOW_HEIGHT)
- 
-win.mainloop()
+    # Create history buttons in toolbar with consistent styling and proper width
+    history_btn = Button(
+        toolbar_frame,
+        text="📚 Histórico",
+        command=show_history,
+        bg=COLORS['bg_clear'],
+        fg=COLORS['fg_text'],
+        font=('Segoe UI', 10, 'bold'),
+        relief='raised',
+        cursor='hand2',
+        activebackground=COLORS['active_clear'],
+        activeforeground=COLORS['fg_text'],
+        bd=2,
+        height=1,
+        width=18
+    )
+    history_btn.pack(side=LEFT, fill=X, expand=True, padx=(10, BUTTON_SPACING//2), pady=2)
+
+    last_btn = Button(
+        toolbar_frame,
+        text="⏮️ Último",
+        command=insert_from_history,
+        bg=COLORS['bg_clear'],
+        fg=COLORS['fg_text'],
+        font=('Segoe UI', 10, 'bold'),
+        relief='raised',
+        cursor='hand2',
+        activebackground=COLORS['active_clear'],
+        activeforeground=COLORS['fg_text'],
+        bd=2,
+        height=1,
+        width=18
+    )
+    last_btn.pack(side=RIGHT, fill=X, expand=True, padx=(BUTTON_SPACING//2, 10), pady=2)
+
+def build_display(container):
+    """Create the input field showing the current expression."""
+    global input_text
+    
+    # 'StringVar()' :It is used to get the instance of input field
+    input_text = StringVar()
+
+    # Let us creating a frame for the input field
+
+    input_frame = Frame(container, width=WINDOW_WIDTH, height=80, bd=0, highlightbackground="#333333",
+     highlightcolor=COLORS['border_input'], highlightthickness=2, bg=COLORS['bg_input'])
+
+    input_frame.pack(side=TOP, pady=5, fill=X)
+
+    #Let us create a input field inside the 'Frame'
+
+    input_field = Entry(input_frame, font=('Segoe UI', 20, 'bold'), 
+    textvariable=input_text, width=WINDOW_WIDTH,bg=COLORS['bg_input'], bd=0, justify=RIGHT,
+    fg=COLORS['fg_text'], insertbackground=COLORS['border_input'])
+
+    input_field.grid(row=0, column=0)
+
+    input_field.pack(ipady=15, padx=10)
+
+def build_keypad(container):
+    """Create the 20 calculator buttons."""
+    btns_frame = Frame(container, width=WINDOW_WIDTH, height=400, bg=COLORS['bg_frame'])
+
+    btns_frame.pack(pady=5, fill=X)
+
+    # Configure grid weights for responsive design
+    for i in range(4):
+        btns_frame.grid_columnconfigure(i, weight=1)
+    for i in range(5):  # Back to 5 rows for standard calculator layout
+        btns_frame.grid_rowconfigure(i, weight=1)
+
+    # Create all buttons using the standardized function
+    # Row 0
+    create_button(btns_frame, "C", COLORS['bg_clear'], COLORS['active_clear'], 
+                  lambda: bt_clear(), 0, 0, columnspan=3, width=23)
+    create_button(btns_frame, "÷", COLORS['bg_operator'], COLORS['active_operator'], 
+                  lambda: btn_click("/"), 0, 3)
+
+    # Row 1  
+    create_button(btns_frame, "7", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(7), 1, 0)
+    create_button(btns_frame, "8", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(8), 1, 1)
+    create_button(btns_frame, "9", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(9), 1, 2)
+    create_button(btns_frame, "×", COLORS['bg_operator'], COLORS['active_operator'], 
+                  lambda: btn_click("*"), 1, 3)
+
+    # Row 2
+    create_button(btns_frame, "4", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(4), 2, 0)
+    create_button(btns_frame, "5", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(5), 2, 1)
+    create_button(btns_frame, "6", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(6), 2, 2)
+    create_button(btns_frame, "−", COLORS['bg_operator'], COLORS['active_operator'], 
+                  lambda: btn_click("-"), 2, 3)
+
+    # Row 3
+    create_button(btns_frame, "1", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(1), 3, 0)
+    create_button(btns_frame, "2", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(2), 3, 1)
+    create_button(btns_frame, "3", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(3), 3, 2)
+    create_button(btns_frame, "+", COLORS['bg_operator'], COLORS['active_operator'], 
+                  lambda: btn_click("+"), 3, 3)
+
+    # Row 4
+    create_button(btns_frame, "0", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click(0), 4, 0, columnspan=2, width=16)
+    create_button(btns_frame, ".", COLORS['bg_number'], COLORS['active_number'], 
+                  lambda: btn_click("."), 4, 2)
+    create_button(btns_frame, "=", COLORS['bg_equals'], COLORS['active_equals'], 
+                  lambda: bt_equal(), 4, 3)
+
+def build_calculator(container):
+    """Create the toolbar, the display and the keypad inside the container."""
+    with profiler.span("build_toolbar"):
+        build_toolbar(container)
+    with profiler.span("build_display"):
+        build_display(container)
+    with profiler.span("build_keypad (fonts + buttons)"):
+        build_keypad(container)
+
+def parse_arguments(argv):
+    """Parse the command-line options (argparse is only imported when needed)."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Calculadora")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="mede as importações e as fases de inicialização e gera um relatório")
+    parser.add_argument('--profile-output', default='startup_profile',
+                        help="caminho do relatório, sem extensão (padrão: startup_profile)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"segundos que um cálculo pode levar antes de ser interrompido "
+                             f"(padrão: {DEFAULT_TIMEOUT:g})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Create the calculator window and run the Tk event loop."""
+    global win, history_manager, evaluation_worker
+    
+    argv = sys.argv[1:] if argv is None else argv
+    timeout = DEFAULT_TIMEOUT
+    if argv:
+        args = parse_arguments(argv)
+        if args.profile_startup:
+            # Re-run this script under -X importtime and report its startup
+            return profile_startup(__file__, args.profile_output)
+        if args.timeout <= 0:
+            print("Erro: --timeout deve ser maior que zero", file=sys.stderr)
+            return 2
+        timeout = args.timeout
+    
+    # Create main window
+    # Create root window
+    with profiler.span("Tk()"):
+        win = Tk()
+    win.title("Modern Calculator")
+    # Make the root background white for visible margin around the calculator
+    win.configure(bg='white')
+    win.resizable(1, 1)
+    win.minsize(350 + MARGIN_SIZE * 2, 500 + MARGIN_SIZE * 2)
+
+    # Set initial size but don't center yet
+    win.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
+
+    # Container frame to create a visible margin around the calculator
+    container = Frame(
+        win,
+        bg=COLORS['bg_main'],
+        padx=MARGIN_SIZE,
+        pady=MARGIN_SIZE,
+        # draw a visible border around the calculator so the margin stands out
+        highlightthickness=2,
+        highlightbackground='#cccccc'
+    )
+    container.pack(fill=BOTH, expand=True)
+
+    # Initialize history manager (loaded after the first paint) and calculation
+    # worker (its process is started after the first paint too)
+    with profiler.span("services"):
+        history_manager = JournalHistoryManager(write_behind=True, autoload=False)
+        evaluation_worker = EvaluationWorker(timeout)
+    
+    build_calculator(container)
+    
+    # Update the window to calculate final size, then center it
+    with profiler.span("update_idletasks + center_window"):
+        win.update_idletasks()
+        center_window(win, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+    win.protocol("WM_DELETE_WINDOW", on_close)
+    
+    if profiler.enabled:
+        # Profiled run: draw the first frame, load the history, then exit
+        with profiler.span("first paint"):
+            win.update()
+        profiler.mark_first_window()
+        with profiler.span("load_history"):
+            history_manager.load_history()
+        profiler.save()
+        on_close()
+        return 0
+    
+    # Load the history file and start the worker once the first frame has been drawn
+    # (calculations made before the load are kept after the loaded ones)
+    win.after_idle(history_manager.load_history)
+    win.after_idle(evaluation_worker.start)
+    win.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
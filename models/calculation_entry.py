@@ -2,17 +2,34 @@
 Model for representing a calculation entry in the history.
 Following Single Responsibility Principle - only handles calculation data.
 """
+import time
 from datetime import datetime
 from typing import Optional
 
+# Lengths of datetime.isoformat() output: seconds only up to microseconds and a UTC offset
+_ISO_MIN_LENGTH = 19
+_ISO_MAX_LENGTH = 32
+
 
 class CalculationEntry:
-    """Represents a single calculation entry in the history."""
-    
+    """
+    Represents a single calculation entry in the history.
+
+    Entries are slotted and keep their timestamp in its cheapest form: an
+    epoch float for new calculations, or the ISO string read from disk.
+    The datetime and the formatted time/date strings are only built when
+    first requested, then cached.
+    """
+
+    __slots__ = (
+        'expression', 'result', '_epoch', '_iso_timestamp', '_datetime',
+        '_formatted_time', '_formatted_date'
+    )
+
     def __init__(self, expression: str, result: str, timestamp: Optional[datetime] = None):
         """
         Initialize a calculation entry.
-        
+
         Args:
             expression: The mathematical expression that was calculated
             result: The result of the calculation
@@ -20,33 +37,91 @@ class CalculationEntry:
         """
         self.expression = expression
         self.result = result
-        self.timestamp = timestamp or datetime.now()
-    
+        self._epoch: Optional[float] = None if timestamp else time.time()
+        self._iso_timestamp: Optional[str] = None
+        self._datetime: Optional[datetime] = timestamp
+        self._formatted_time: Optional[str] = None
+        self._formatted_date: Optional[str] = None
+
+    @classmethod
+    def from_iso(cls, expression: str, result: str, iso_timestamp: str) -> 'CalculationEntry':
+        """
+        Create an entry from an ISO 8601 timestamp without decoding it yet.
+
+        Args:
+            expression: The mathematical expression that was calculated
+            result: The result of the calculation
+            iso_timestamp: Timestamp as produced by datetime.isoformat()
+            
+        Raises:
+            ValueError: If the timestamp is clearly not an ISO 8601 string
+                (only its shape is checked here; it is decoded on first use)
+        """
+        if not (isinstance(iso_timestamp, str)
+                and _ISO_MIN_LENGTH <= len(iso_timestamp) <= _ISO_MAX_LENGTH
+                and iso_timestamp[4] == '-' and iso_timestamp[7] == '-'
+                and iso_timestamp[13] == ':'):
+            raise ValueError(f"Invalid timestamp: {iso_timestamp!r}")
+        entry = cls.__new__(cls)
+        entry.expression = expression
+        entry.result = result
+        entry._epoch = None
+        entry._iso_timestamp = iso_timestamp
+        entry._datetime = None
+        entry._formatted_time = None
+        entry._formatted_date = None
+        return entry
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the calculation was performed (decoded on first access)."""
+        if self._datetime is None:
+            if self._iso_timestamp is not None:
+                self._datetime = datetime.fromisoformat(self._iso_timestamp)
+            else:
+                self._datetime = datetime.fromtimestamp(self._epoch)
+        return self._datetime
+
+    @property
+    def iso_timestamp(self) -> str:
+        """The timestamp in ISO 8601 format, as stored on disk."""
+        if self._iso_timestamp is None:
+            self._iso_timestamp = self.timestamp.isoformat()
+        return self._iso_timestamp
+
     def to_dict(self) -> dict:
         """Convert the entry to a dictionary for serialization."""
         return {
             'expression': self.expression,
             'result': self.result,
-            'timestamp': self.timestamp.isoformat()
+            'timestamp': self.iso_timestamp
         }
-    
+
     @classmethod
     def from_dict(cls, data: dict) -> 'CalculationEntry':
         """Create a CalculationEntry from a dictionary."""
-        return cls(
-            expression=data['expression'],
-            result=data['result'],
-            timestamp=datetime.fromisoformat(data['timestamp'])
-        )
-    
+        return cls.from_iso(data['expression'], data['result'], data['timestamp'])
+
     def __str__(self) -> str:
         """String representation of the calculation entry."""
         return f"{self.expression} = {self.result}"
-    
+
     def get_formatted_time(self) -> str:
-        """Get formatted timestamp for display."""
-        return self.timestamp.strftime("%H:%M:%S")
-    
+        """Get formatted timestamp for display (the stored text if it cannot be decoded)."""
+        if self._formatted_time is None:
+            self._formatted_time = self._format_timestamp("%H:%M:%S")
+        return self._formatted_time
+
     def get_formatted_date(self) -> str:
-        """Get formatted date for display."""
-        return self.timestamp.strftime("%d/%m/%Y")
+        """Get formatted date for display (the stored text if it cannot be decoded)."""
+        if self._formatted_date is None:
+            self._formatted_date = self._format_timestamp("%d/%m/%Y")
+        return self._formatted_date
+
+    def _format_timestamp(self, format_spec: str) -> str:
+        """Format the timestamp, falling back to the ISO text read from disk."""
+        try:
+            return self.timestamp.strftime(format_spec)
+        except ValueError:
+            # Passed the shape check of from_iso but is not a real date
+            return self._iso_timestamp
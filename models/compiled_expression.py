@@ -0,0 +1,52 @@
+"""
+Model for the compiled form of a calculator expression.
+Following Single Responsibility Principle - only holds the compiled program data.
+"""
+from typing import Any, Callable, Sequence, Tuple, Union
+
+# Instruction opcodes of a compiled program
+PUSH = 0    # push a constant
+UNARY = 1   # replace the top value with operation(top)
+BINARY = 2  # replace the two top values with operation(left, right)
+LOAD = 3    # push the literal at this index of the expression's literals
+
+# (opcode, constant, literal index or operation callable)
+Instruction = Tuple[int, Union[Any, Callable]]
+
+
+class CompiledExpression:
+    """
+    A parsed expression compiled to a postfix (RPN) program.
+
+    Either constant sub-expressions are folded at compile time, so an
+    expression that evaluates without errors compiles to a single PUSH;
+    or the program only has the shape of the expression, loading its
+    literals from `literals`, so every expression with that shape (e.g.
+    "2+3" and "4+5") shares one program.
+    """
+
+    __slots__ = ('program', 'literals')
+
+    def __init__(self, program: Tuple[Instruction, ...], literals: Sequence[Any] = ()):
+        """
+        Initialize a compiled expression.
+
+        Args:
+            program: Instructions in evaluation order
+            literals: Values of the expression's literals, for LOAD instructions
+        """
+        self.program = program
+        self.literals = literals
+
+    @property
+    def is_constant(self) -> bool:
+        """Whether the whole expression was folded into one constant."""
+        return len(self.program) == 1 and self.program[0][0] == PUSH
+
+    def __len__(self) -> int:
+        return len(self.program)
+
+    def __repr__(self) -> str:
+        if self.literals:
+            return f"CompiledExpression({self.program!r}, {self.literals!r})"
+        return f"CompiledExpression({self.program!r})"
@@ -0,0 +1,79 @@
+"""
+Models for the parsed form of a calculator expression.
+Following Single Responsibility Principle - only holds the expression tree data.
+"""
+from typing import Union
+
+
+class ExpressionNode:
+    """Base class for every node of a parsed expression tree."""
+
+
+class NumberNode(ExpressionNode):
+    """A numeric literal."""
+
+    def __init__(self, value: Union[int, float]):
+        """
+        Initialize a number node.
+
+        Args:
+            value: The literal value (int for whole literals, float otherwise)
+        """
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"NumberNode({self.value!r})"
+
+
+class VariableNode(ExpressionNode):
+    """A named variable whose value is supplied at evaluation time."""
+
+    def __init__(self, name: str):
+        """
+        Initialize a variable node.
+
+        Args:
+            name: The variable name as written in the expression
+        """
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"VariableNode({self.name!r})"
+
+
+class UnaryOpNode(ExpressionNode):
+    """A prefix sign applied to a sub-expression (e.g. -x)."""
+
+    def __init__(self, operator: str, operand: ExpressionNode):
+        """
+        Initialize a unary operation node.
+
+        Args:
+            operator: The sign symbol ('+' or '-')
+            operand: The sub-expression the sign applies to
+        """
+        self.operator = operator
+        self.operand = operand
+
+    def __repr__(self) -> str:
+        return f"UnaryOpNode({self.operator!r}, {self.operand!r})"
+
+
+class BinaryOpNode(ExpressionNode):
+    """An infix operation between two sub-expressions (e.g. a * b)."""
+
+    def __init__(self, operator: str, left: ExpressionNode, right: ExpressionNode):
+        """
+        Initialize a binary operation node.
+
+        Args:
+            operator: The operator symbol ('+', '-', '*', '/', '//' or '**')
+            left: The left operand
+            right: The right operand
+        """
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"BinaryOpNode({self.operator!r}, {self.left!r}, {self.right!r})"
@@ -0,0 +1,85 @@
+"""
+Background Writer Service - coalesces persistence work on a worker thread.
+Following Single Responsibility Principle - only schedules deferred writes.
+"""
+import threading
+import time
+from typing import Callable
+
+
+class BackgroundWriter:
+    """Runs a flush callback on a background thread, coalescing bursts."""
+    
+    def __init__(self, flush_callback: Callable[[], None], max_delay: float = 0.5):
+        """
+        Initialize and start the writer thread.
+        
+        Args:
+            flush_callback: Function that writes everything pending
+            max_delay: Longest time (seconds) a scheduled write may be deferred;
+                every schedule() inside that window shares a single flush
+        """
+        self.flush_callback = flush_callback
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._flush_requested = False
+        self._flushing = False
+        self._closed = False
+        self._deadline = 0.0
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+    
+    def schedule(self) -> None:
+        """Request a flush within max_delay seconds."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BackgroundWriter is closed")
+            if not self._dirty:
+                self._dirty = True
+                self._deadline = time.monotonic() + self.max_delay
+                self._condition.notify_all()
+    
+    def flush(self) -> None:
+        """Write everything pending now and wait until it is on disk."""
+        with self._condition:
+            while (self._dirty or self._flushing) and self._thread.is_alive():
+                self._flush_requested = True
+                self._condition.notify_all()
+                self._condition.wait()
+    
+    def close(self) -> None:
+        """Flush pending work and stop the writer thread."""
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        """Writer loop: wait for work, let bursts coalesce, then flush once."""
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                if not self._dirty:
+                    return
+                
+                while not (self._flush_requested or self._closed):
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                
+                self._dirty = False
+                self._flush_requested = False
+                self._flushing = True
+            
+            try:
+                self.flush_callback()
+            except Exception as e:
+                print(f"Error in background write: {e}")
+            finally:
+                with self._condition:
+                    self._flushing = False
+                    self._condition.notify_all()
@@ -0,0 +1,140 @@
+"""
+Calculation Service - the expression to formatted result pipeline.
+Following Single Responsibility Principle - only coordinates a calculation.
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+from services.expression_evaluator import ExpressionEvaluator
+from services.result_cache import LRUCache
+from utils.formatters import ExpressionValidator, NumberFormatter, Token
+from utils.metrics import metrics
+
+
+class CalculationService:
+    """Sanitizes, evaluates and formats expressions, memoizing the results."""
+
+    def __init__(self, evaluator: Optional[ExpressionEvaluator] = None,
+                 cache_size: int = 256):
+        """
+        Initialize the calculation service.
+
+        Args:
+            evaluator: Evaluator used for cache misses (a new one by default)
+            cache_size: Maximum number of memoized results (0 disables the cache)
+        """
+        self.evaluator = evaluator or ExpressionEvaluator()
+        self.cache = LRUCache(cache_size)
+
+    def calculate(self, expression: str) -> str:
+        """
+        Calculate an expression and return the formatted result.
+
+        Args:
+            expression: Expression as typed (display symbols are accepted)
+
+        Returns:
+            The result formatted by NumberFormatter.format_result
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the expression would take too long to evaluate
+            ZeroDivisionError: If the expression divides by zero
+        """
+        if metrics.enabled:
+            return self._calculate_measured(expression)
+
+        sanitized_expr = ExpressionValidator.sanitize_expression(expression)
+
+        cached_result = self.cache.get(sanitized_expr)
+        if cached_result is not None:
+            return cached_result
+
+        result = self.evaluator.evaluate(sanitized_expr)
+        formatted_result = NumberFormatter.format_result(result, self.evaluator.precision)
+        self.cache.put(sanitized_expr, formatted_result)
+        return formatted_result
+
+    def calculate_tokens(self, tokens: Sequence[Token]) -> str:
+        """
+        Calculate an expression already split by ExpressionValidator.tokenize.
+
+        Lets callers that also need the tokens (e.g. to format the expression
+        for display) scan the expression only once.
+
+        Args:
+            tokens: Tokens of the sanitized expression
+
+        Returns:
+            The result formatted by NumberFormatter.format_result
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the expression would take too long to evaluate
+            ZeroDivisionError: If the expression divides by zero
+        """
+        if metrics.enabled:
+            return self._calculate_tokens_measured(tokens)
+
+        # The normalized form re-tokenizes to the same tokens, so this key can
+        # share the cache with calculate() without ever meaning another expression
+        key = ExpressionValidator.normalize_tokens(tokens)
+
+        cached_result = self.cache.get(key)
+        if cached_result is not None:
+            return cached_result
+
+        result = self.evaluator.evaluate_tokens(tokens)
+        formatted_result = NumberFormatter.format_result(result, self.evaluator.precision)
+        self.cache.put(key, formatted_result)
+        return formatted_result
+
+    def _calculate_measured(self, expression: str) -> str:
+        """calculate(), recording the time of each stage in the metrics."""
+        try:
+            with metrics.time('sanitize'):
+                sanitized_expr = ExpressionValidator.sanitize_expression(expression)
+            return self._lookup_measured(sanitized_expr, self.evaluator.evaluate, sanitized_expr)
+        except Exception as e:
+            metrics.count('errors', type=type(e).__name__)
+            raise
+
+    def _calculate_tokens_measured(self, tokens: Sequence[Token]) -> str:
+        """calculate_tokens(), recording the time of each stage in the metrics."""
+        try:
+            key = ExpressionValidator.normalize_tokens(tokens)
+            return self._lookup_measured(key, self.evaluator.evaluate_tokens, tokens)
+        except Exception as e:
+            metrics.count('errors', type=type(e).__name__)
+            raise
+
+    def _lookup_measured(self, key: Hashable, evaluate: Callable[[Any], Any],
+                         expression: Any) -> str:
+        """
+        Serve a result from the cache, or evaluate and format it, timing each stage.
+
+        Args:
+            key: Cache key of the expression
+            evaluate: Evaluator method to call on a cache miss
+            expression: Argument of that method (expression or tokens)
+
+        Returns:
+            The formatted result
+        """
+        cached_result = self.cache.get(key)
+        if cached_result is not None:
+            metrics.count('cache_hits')
+            return cached_result
+
+        metrics.count('evaluations')
+        with metrics.time('evaluate'):
+            result = evaluate(expression)
+        with metrics.time('format_result'):
+            formatted_result = NumberFormatter.format_result(result, self.evaluator.precision)
+        self.cache.put(key, formatted_result)
+        return formatted_result
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the statistics of the result cache and of the compiled-expression cache."""
+        return {
+            'results': self.cache.stats(),
+            'compiled': self.evaluator.compiled_cache.stats()
+        }
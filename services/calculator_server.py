@@ -0,0 +1,499 @@
+"""
+Calculator Server - serves the calculation pipeline as newline-delimited JSON over a socket.
+Following Single Responsibility Principle - only handles the network protocol and request scheduling.
+"""
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Set, Tuple
+from services.calculation_service import CalculationService
+from services.expression_evaluator import ExpressionTooCostlyError, InvalidExpressionError
+from services.history_manager import HistoryManager
+from utils.formatters import ExpressionValidator
+from utils.metrics import metrics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_MAX_PIPELINE = 64       # unanswered requests per connection before it stops being read
+DEFAULT_MAX_PENDING = 4096      # queued calculations before every connection stops being read
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_BATCH_DELAY = 0.0       # seconds a batch waits for more requests (0: only those already read)
+MAX_LINE_LENGTH = 64 * 1024
+
+# History sessions are files in the history directory: no path separators
+_SESSION_NAME = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# (succeeded, result or error message)
+Outcome = Tuple[bool, str]
+Response = Dict[str, Any]
+
+
+def calculate_outcome(service: CalculationService, expression: str) -> Outcome:
+    """
+    Calculate a single expression, turning calculation errors into messages.
+
+    Args:
+        service: Calculation pipeline to use
+        expression: The expression to calculate
+
+    Returns:
+        Tuple of success flag and result (or error message)
+    """
+    try:
+        return True, service.calculate(expression)
+    except InvalidExpressionError:
+        return False, "Expressão inválida!"
+    except ExpressionTooCostlyError as e:
+        return False, str(e)
+    except ZeroDivisionError:
+        return False, "Divisão por zero!"
+    except Exception as e:
+        return False, f"Erro no cálculo: {str(e)}"
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Encode a request or response as one line of JSON."""
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _error_response(request_id: Any, message: str) -> Response:
+    """Build the response of a failed request."""
+    return {'id': request_id, 'ok': False, 'error': message}
+
+
+def _completed(response: Response) -> 'asyncio.Future[Response]':
+    """Wrap a response that is ready right away so it queues like pending ones."""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(response)
+    return future
+
+
+def _discard(pending: Optional[Awaitable[Response]]) -> None:
+    """Drop a response that will never be sent (closing its coroutine, if any)."""
+    if asyncio.iscoroutine(pending):
+        pending.close()
+
+
+class _Connection:
+    """Per-connection state: the history session opened by the client, if any."""
+
+    __slots__ = ('session', 'history')
+
+    def __init__(self):
+        self.session: Optional[str] = None
+        self.history: Optional[HistoryManager] = None
+
+
+class CalculatorServer:
+    """
+    Asyncio server answering calculation requests, one JSON object per line.
+
+    Requests are pipelined: a client may send many lines without waiting,
+    and the responses come back in request order. Calculations from every
+    connection go through one queue and are evaluated in micro-batches on
+    a single evaluation thread, so the event loop only handles I/O and the
+    calculation caches are never shared between threads.
+
+    Backpressure: a connection is not read while it has max_pipeline
+    unanswered requests, and no connection is read while max_pending
+    calculations are queued; the kernel socket buffers then slow the
+    clients down.
+    """
+
+    def __init__(self, service: Optional[CalculationService] = None,
+                 history_dir: Optional[str] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_pipeline: int = DEFAULT_MAX_PIPELINE,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 batch_delay: float = DEFAULT_BATCH_DELAY):
+        """
+        Initialize the server (nothing is bound until start()).
+
+        Args:
+            service: Calculation pipeline (a new one by default); only the
+                evaluation thread uses it
+            history_dir: Directory of the per-client history files; None
+                disables the 'session' and 'history' operations
+            max_connections: Connections served at once; extra ones get an
+                error and are closed
+            max_pipeline: Unanswered requests per connection before reading pauses
+            max_pending: Queued calculations before every connection pauses
+            max_batch_size: Most calculations evaluated in one pass
+            batch_delay: Seconds a batch waits for more requests after its first
+        """
+        if min(max_connections, max_pipeline, max_pending, max_batch_size) < 1:
+            raise ValueError("server limits must be positive")
+        if batch_delay < 0:
+            raise ValueError("batch_delay cannot be negative")
+        self.service = service or CalculationService()
+        self.history_dir = history_dir
+        self.max_connections = max_connections
+        self.max_pipeline = max_pipeline
+        self.max_pending = max_pending
+        self.max_batch_size = max_batch_size
+        self.batch_delay = batch_delay
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._unix_path: Optional[str] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections = 0
+        self._handlers: Set[asyncio.Task] = set()
+        # Open history sessions: name -> (manager being loaded, connections using it)
+        self._sessions: Dict[str, List] = {}
+        # Sessions no one uses any more, still writing their history: name -> closing task
+        self._closing: Dict[str, asyncio.Task] = {}
+        self._stats = {'requests': 0, 'calculations': 0, 'batches': 0, 'largest_batch': 0,
+                       'rejected_connections': 0}
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_path: Optional[str] = None) -> None:
+        """
+        Bind the socket and start accepting connections.
+
+        Args:
+            host: Interface to listen on (TCP)
+            port: Port to listen on (TCP; 0 picks a free one)
+            unix_path: Listen on this Unix socket instead of TCP
+        """
+        self._queue = asyncio.Queue(self.max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calculator-server")
+        self._batch_task = asyncio.create_task(self._run_batches())
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix_path, limit=MAX_LINE_LENGTH
+            )
+            self._unix_path = unix_path
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=MAX_LINE_LENGTH
+            )
+
+    @property
+    def addresses(self) -> List[Any]:
+        """Addresses the server listens on (host/port tuples or socket paths)."""
+        return [sock.getsockname() for sock in self._server.sockets] if self._server else []
+
+    async def serve_forever(self) -> None:
+        """Serve until the task is cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections, drop the open ones and close the sessions."""
+        if self._server is not None:
+            self._server.close()
+            for handler in list(self._handlers):
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._unix_path is not None:
+            try:
+                os.unlink(self._unix_path)
+            except OSError:
+                pass
+            self._unix_path = None
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for name in list(self._sessions):
+            self._close_session(name)
+        await asyncio.gather(*self._closing.values(), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the request, batching and cache counters of the server (and the metrics, when enabled)."""
+        stats = dict(self._stats)
+        stats['connections'] = self._connections
+        stats['pending'] = self._queue.qsize() if self._queue else 0
+        stats['mean_batch'] = stats['calculations'] / stats['batches'] if stats['batches'] else 0.0
+        stats['cache'] = self.service.cache_stats()
+        if metrics.enabled:
+            stats['metrics'] = metrics.snapshot()
+        return stats
+
+    # Connections
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Read the requests of one client and queue their responses in order."""
+        if self._connections >= self.max_connections:
+            self._stats['rejected_connections'] += 1
+            await self._reject(writer, f"Servidor ocupado: limite de {self.max_connections} conexões")
+            return
+
+        self._connections += 1
+        self._handlers.add(asyncio.current_task())
+        connection = _Connection()
+        # Bounded: a client that sends faster than it reads stops being read
+        responses: asyncio.Queue = asyncio.Queue(self.max_pipeline)
+        writer_task = asyncio.create_task(self._write_responses(responses, writer))
+        pending = None
+        try:
+            while not writer_task.done():
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than MAX_LINE_LENGTH: the stream cannot be resynchronized
+                    await responses.put(_completed(_error_response(None, "Requisição longa demais")))
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if line.isspace():
+                    continue
+                self._stats['requests'] += 1
+                pending = await self._dispatch(line, connection)
+                await responses.put(pending)
+                pending = None
+            await responses.put(None)
+            await writer_task
+        except asyncio.CancelledError:
+            # Server shutdown: the unanswered requests are dropped. Not
+            # re-raised, as asyncio would log the handler's cancellation.
+            writer_task.cancel()
+            writer.close()
+            while not responses.empty():
+                _discard(responses.get_nowait())
+            _discard(pending)
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            self._leave_session(connection)
+            self._connections -= 1
+
+    @staticmethod
+    async def _reject(writer: asyncio.StreamWriter, message: str) -> None:
+        """Send an error to a connection that will not be served, then close it."""
+        try:
+            writer.write(encode_message(_error_response(None, message)))
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    async def _write_responses(responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """Send the responses of one connection in request order."""
+        broken = False
+        while True:
+            pending = await responses.get()
+            if pending is None:
+                break
+            response = await pending
+            if broken:
+                continue  # keep consuming so the reader is never blocked
+            writer.write(encode_message(response))
+            # Answers of a pipelined burst are flushed together
+            if responses.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    broken = True
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    # Requests
+
+    async def _dispatch(self, line: bytes, connection: _Connection) -> Awaitable[Response]:
+        """
+        Start handling one request line.
+
+        Calculations are queued for the next batch; waiting for the queue
+        is what pauses reading when the server is overloaded.
+
+        Returns:
+            Awaitable of the response, to be awaited in request order (the
+            operations other than calculations only run then, so they see
+            the effect of every earlier request)
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _completed(_error_response(None, "JSON inválido"))
+        if not isinstance(request, dict):
+            return _completed(_error_response(None, "A requisição deve ser um objeto JSON"))
+
+        request_id = request.get('id')
+        operation = request.get('op', 'calculate')
+        if operation == 'calculate':
+            expression = request.get('expression')
+            if not isinstance(expression, str):
+                return _completed(_error_response(request_id, "Campo 'expression' ausente"))
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((expression, future))
+            return self._calculation_response(request_id, expression, future, connection)
+        if operation == 'session':
+            # Not started before its turn: a coroutine only runs once awaited
+            return self._open_session(request_id, request.get('name'), connection)
+        if operation == 'history':
+            return self._in_order(self._history_response, request_id, request.get('count', 10),
+                                  connection)
+        if operation == 'stats':
+            return self._in_order(self._stats_response, request_id)
+        return _completed(_error_response(request_id, f"Operação desconhecida: {operation}"))
+
+    @staticmethod
+    async def _in_order(operation, *args) -> Response:
+        """Run an operation when its turn comes, after the earlier requests are answered."""
+        return operation(*args)
+
+    def _stats_response(self, request_id: Any) -> Response:
+        """Report the server counters."""
+        return {'id': request_id, 'ok': True, 'stats': self.stats()}
+
+    async def _calculation_response(self, request_id: Any, expression: str,
+                                    future: 'asyncio.Future[Outcome]',
+                                    connection: _Connection) -> Response:
+        """Wait for a queued calculation and record it in the client's session."""
+        succeeded, value = await future
+        if not succeeded:
+            return _error_response(request_id, value)
+        if connection.history is not None:
+            # Awaited in request order, so the history keeps the client's order
+            with metrics.time('format_for_display'):
+                display_expr = ExpressionValidator.format_for_display(
+                    ExpressionValidator.sanitize_expression(expression)
+                )
+            connection.history.add_calculation(display_expr, value)
+        return {'id': request_id, 'ok': True, 'result': value}
+
+    # Batching
+
+    async def _run_batches(self) -> None:
+        """Evaluate queued calculations in batches, one batch at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_delay and self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.batch_delay)
+            else:
+                # Let the readers that already have requests buffered queue them
+                await asyncio.sleep(0)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self._stats['batches'] += 1
+            self._stats['calculations'] += len(batch)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+            expressions = [expression for expression, _ in batch]
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._calculate_batch, expressions)
+            except Exception as e:
+                outcomes = [(False, f"Erro no cálculo: {str(e)}")] * len(batch)
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+
+    def _calculate_batch(self, expressions: Sequence[str]) -> List[Outcome]:
+        """
+        Calculate a batch in one pass (runs on the evaluation thread).
+
+        The batch is sanitized at once and every distinct expression is
+        calculated only once, however many clients sent it.
+
+        Args:
+            expressions: Expressions as received
+
+        Returns:
+            The outcomes, in the same order
+        """
+        outcomes: Dict[str, Outcome] = {}
+        results = []
+        for expression in ExpressionValidator.sanitize_expressions(expressions):
+            outcome = outcomes.get(expression)
+            if outcome is None:
+                outcome = outcomes[expression] = calculate_outcome(self.service, expression)
+            results.append(outcome)
+        return results
+
+    # History sessions
+
+    async def _open_session(self, request_id: Any, name: Any, connection: _Connection) -> Response:
+        """Attach the connection to a named history, loading it if needed."""
+        if self.history_dir is None:
+            return _error_response(request_id, "Sessões de histórico desativadas no servidor")
+        if not isinstance(name, str) or not _SESSION_NAME.fullmatch(name):
+            return _error_response(request_id, "Nome de sessão inválido (letras, dígitos, _ e -)")
+        if name != connection.session:
+            self._leave_session(connection)
+            session = self._sessions.get(name)
+            if session is None:
+                path = os.path.join(self.history_dir, f"{name}.json")
+                loading = asyncio.ensure_future(self._load_session(path, self._closing.get(name)))
+                session = self._sessions[name] = [loading, 0]
+            session[1] += 1
+            connection.session = name
+            # Shielded: other connections may be waiting for the same load
+            connection.history = await asyncio.shield(session[0])
+        return {'id': request_id, 'ok': True, 'session': name,
+                'count': connection.history.get_history_count()}
+
+    def _history_response(self, request_id: Any, count: Any, connection: _Connection) -> Response:
+        """List the most recent calculations of the connection's session."""
+        if connection.history is None:
+            return _error_response(request_id, "Nenhuma sessão aberta (use a operação 'session')")
+        if not isinstance(count, int) or count < 1:
+            return _error_response(request_id, "Campo 'count' deve ser um inteiro positivo")
+        entries = connection.history.get_recent_history(count)
+        return {'id': request_id, 'ok': True, 'history': [entry.to_dict() for entry in entries]}
+
+    def _leave_session(self, connection: _Connection) -> None:
+        """Detach the connection from its session, closing it when no one else uses it."""
+        if connection.session is None:
+            return
+        session = self._sessions[connection.session]
+        session[1] -= 1
+        if not session[1]:
+            self._close_session(connection.session)
+        connection.session = None
+        connection.history = None
+
+    @staticmethod
+    async def _load_session(path: str, closing: Optional[asyncio.Task]) -> HistoryManager:
+        """
+        Load a session's history off the event loop.
+
+        Args:
+            path: The history file
+            closing: The previous session of that history, if it is still
+                writing its last calculations (waited for first)
+        """
+        if closing is not None:
+            await asyncio.wait([closing])
+        # Read on a default executor thread (not the evaluation thread), then
+        # saved on the history writer thread, never on the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(HistoryManager, path, write_behind=True)
+        )
+
+    def _close_session(self, name: str) -> None:
+        """Forget an open session and close its history off the event loop."""
+        loading, _ = self._sessions.pop(name)
+        self._closing[name] = asyncio.ensure_future(self._finish_session(name, loading))
+
+    async def _finish_session(self, name: str, loading: 'asyncio.Future[HistoryManager]') -> None:
+        """Write a closed session's pending calculations and stop its writer thread."""
+        try:
+            manager = await loading
+            await asyncio.get_running_loop().run_in_executor(None, manager.close)
+        finally:
+            if self._closing.get(name) is asyncio.current_task():
+                del self._closing[name]
@@ -0,0 +1,177 @@
+"""
+Evaluation Worker Service - runs calculations in a child process with a deadline.
+Following Single Responsibility Principle - only runs and supervises out-of-process calculations.
+"""
+import signal
+import time
+from typing import Optional, Sequence
+from services.calculation_service import CalculationService
+from services.expression_evaluator import FLOAT_ARITHMETIC, ExpressionEvaluator
+from utils.formatters import DEFAULT_PRECISION, Token
+from utils.metrics import metrics
+
+DEFAULT_TIMEOUT = 5.0
+
+
+class EvaluationTimeoutError(TimeoutError):
+    """Raised when a calculation does not finish before its deadline."""
+
+
+class EvaluationWorkerError(RuntimeError):
+    """Raised when the worker process dies in the middle of a calculation."""
+
+
+def _serve(connection, cache_size: int, arithmetic: str, precision: int) -> None:
+    """Worker loop: calculate every token list received and send back the outcome."""
+    # Ctrl+C in the terminal is for the calculator, not for its worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # What this process records is sent with each outcome and saved by the parent
+    metrics.output_file = None
+    service = CalculationService(ExpressionEvaluator(arithmetic, precision), cache_size)
+    while True:
+        try:
+            tokens = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            outcome = (True, service.calculate_tokens(tokens))
+        except Exception as e:
+            outcome = (False, e)
+        recorded = metrics.take()
+        try:
+            connection.send(outcome + (recorded,))
+        except Exception:
+            # The exception could not be pickled: send its message instead
+            connection.send((False, EvaluationWorkerError(str(outcome[1])), recorded))
+
+
+class EvaluationWorker:
+    """
+    Calculates expressions in a child process that can be killed at any time.
+
+    One calculation runs at a time: submit() hands it to the worker and
+    poll() collects the result without blocking, so a GUI can poll from
+    its event loop. A calculation past its deadline, or cancelled, kills
+    the worker; a fresh one is started right away for the next calculation.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, cache_size: int = 256,
+                 arithmetic: str = FLOAT_ARITHMETIC, precision: int = DEFAULT_PRECISION):
+        """
+        Initialize the worker (the process is only started by start() or submit()).
+
+        Args:
+            timeout: Wall-clock seconds a calculation may take
+            cache_size: Size of the worker's result cache
+            arithmetic: Arithmetic mode of the worker's evaluator
+            precision: Significant digits of Decimal/Fraction results
+        """
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self.timeout = timeout
+        self._worker_args = (cache_size, arithmetic, precision)
+        self._process = None
+        self._connection = None
+        self._deadline: Optional[float] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a calculation was submitted and not collected yet."""
+        return self._deadline is not None
+
+    def start(self) -> None:
+        """Start the worker process if it is not running (its imports take a moment)."""
+        if self._process is not None and self._process.is_alive():
+            return
+        self._stop()
+        # Imported here so that starting the calculator does not pay for it
+        import multiprocessing
+        # Spawn, not fork: the parent runs Tk and the history writer thread
+        context = multiprocessing.get_context('spawn')
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(child_connection,) + self._worker_args,
+            name="calculator-evaluation", daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+
+    def submit(self, tokens: Sequence[Token]) -> None:
+        """
+        Hand a tokenized expression to the worker.
+
+        Args:
+            tokens: Tokens returned by ExpressionValidator.tokenize
+
+        Raises:
+            RuntimeError: If a calculation is already running
+        """
+        if self.busy:
+            raise RuntimeError("a calculation is already running")
+        self.start()
+        self._connection.send(list(tokens))
+        self._deadline = time.monotonic() + self.timeout
+
+    def poll(self) -> Optional[str]:
+        """
+        Collect the result of the running calculation without blocking.
+
+        Returns:
+            The formatted result, or None while the calculation is running
+
+        Raises:
+            EvaluationTimeoutError: If the deadline passed (the worker is replaced)
+            EvaluationWorkerError: If the worker process died
+            Exception: The error raised by the calculation itself
+                (InvalidExpressionError, ZeroDivisionError, ...)
+        """
+        if not self.busy:
+            raise RuntimeError("no calculation is running")
+        if not self._connection.poll():
+            if time.monotonic() < self._deadline:
+                return None
+            self._restart()
+            metrics.count('errors', type=EvaluationTimeoutError.__name__)
+            raise EvaluationTimeoutError(
+                f"O cálculo excedeu o limite de {self.timeout:g} s e foi interrompido"
+            )
+        try:
+            succeeded, value, recorded = self._connection.recv()
+        except (EOFError, OSError):
+            self._restart()
+            metrics.count('errors', type=EvaluationWorkerError.__name__)
+            raise EvaluationWorkerError("O processo de cálculo terminou inesperadamente") from None
+        self._deadline = None
+        metrics.merge(recorded)
+        if succeeded:
+            return value
+        raise value
+
+    def cancel(self) -> None:
+        """Abandon the running calculation, killing the worker (no-op when idle)."""
+        if self.busy:
+            self._restart()
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        self._stop()
+
+    def _restart(self) -> None:
+        """Kill the worker and start a fresh one in the background."""
+        self._stop()
+        self.start()
+
+    def _stop(self) -> None:
+        """Kill the worker process, if any, and wait for it to exit."""
+        self._deadline = None
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+            self._process.close()
+            self._process = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,548 @@
+"""
+Expression Evaluator Service - parses and evaluates calculator expressions.
+Following Single Responsibility Principle - only turns expressions into numbers.
+"""
+import operator
+import sys
+from decimal import ROUND_FLOOR, Context, Decimal, DecimalException, Overflow, localcontext
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from models.compiled_expression import BINARY, LOAD, PUSH, UNARY, CompiledExpression, Instruction
+from models.expression_node import (
+    BinaryOpNode, ExpressionNode, NumberNode, UnaryOpNode, VariableNode
+)
+from services.result_cache import LRUCache
+# InvalidExpressionError and ExpressionTooCostlyError are defined in utils, next
+# to the tokenizer, and re-exported here
+from utils.cost_estimator import CostEstimator, ExpressionTooCostlyError
+from utils.formatters import DEFAULT_PRECISION, ExpressionValidator, InvalidExpressionError, Token
+
+Number = Union[int, float, Decimal, Fraction]
+
+# Arithmetic modes: how division and decimal literals are represented
+FLOAT_ARITHMETIC = 'float'        # binary floats (the calculator's default)
+DECIMAL_ARITHMETIC = 'decimal'    # decimal.Decimal with a configurable precision
+FRACTION_ARITHMETIC = 'fraction'  # exact fractions.Fraction
+ARITHMETIC_MODES = (FLOAT_ARITHMETIC, DECIMAL_ARITHMETIC, FRACTION_ARITHMETIC)
+
+# Binding strength of the infix operators (higher binds tighter).
+_BINARY_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '//': 2, '**': 4}
+# Prefix signs bind tighter than * and / but looser than ** (-2**2 == -4).
+_UNARY_PRECEDENCE = 3
+_RIGHT_ASSOCIATIVE = {'**'}
+
+_BINARY_OPERATIONS: Dict[str, Callable[[Number, Number], Number]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '//': operator.floordiv,
+    '**': operator.pow,
+}
+
+_UNARY_OPERATIONS: Dict[str, Callable[[Number], Number]] = {
+    '+': operator.pos,
+    '-': operator.neg,
+}
+
+
+# In the exact modes int-only operations keep using the native int operators
+# above; only the operations that would produce a float from ints change.
+
+def _decimal_divide(left: Number, right: Number) -> Decimal:
+    """True division as Decimal (rounded by the active decimal context)."""
+    return Decimal(left) / Decimal(right)
+
+
+def _decimal_floor_divide(left: Number, right: Number) -> Number:
+    """Floor division that rounds toward -inf like int // (Decimal // truncates)."""
+    if type(left) is int and type(right) is int:
+        return left // right
+    return _decimal_divide(left, right).to_integral_value(rounding=ROUND_FLOOR)
+
+
+def _decimal_power(left: Number, right: Number) -> Number:
+    """Power that stays int for non-negative int exponents, Decimal otherwise."""
+    if type(left) is int and type(right) is int and right >= 0:
+        return left ** right
+    if not left and right < 0:
+        # Decimal would return Infinity; match int and float arithmetic
+        raise ZeroDivisionError("0 cannot be raised to a negative power")
+    return Decimal(left) ** Decimal(right)
+
+
+def _decimal_error(error: DecimalException) -> Exception:
+    """
+    Translate a trapped decimal signal into the error the other modes raise.
+
+    Division by zero (0/0 included) becomes ZeroDivisionError, a result
+    beyond the Decimal exponent range ExpressionTooCostlyError, and an
+    operation without a Decimal result (e.g. a fractional power of a
+    negative number, a complex number in the other modes)
+    InvalidExpressionError.
+    """
+    # The C implementation raises the first trapped signal with the list of all of them
+    signals = error.args[0] if error.args and isinstance(error.args[0], list) else [type(error)]
+    if any(issubclass(signal, ZeroDivisionError) for signal in signals):
+        return ZeroDivisionError("division by zero")
+    if any(issubclass(signal, Overflow) for signal in signals):
+        return ExpressionTooCostlyError("Resultado grande demais para o modo decimal")
+    return InvalidExpressionError("Operação sem resultado no modo decimal")
+
+
+def _fraction_divide(left: Number, right: Number) -> Fraction:
+    """True division as an exact Fraction."""
+    return Fraction(left) / right
+
+
+def _fraction_power(left: Number, right: Number) -> Number:
+    """Power that is exact for int exponents (irrational roots fall back to float)."""
+    if type(right) is int:
+        return left ** right if right >= 0 else Fraction(left) ** right
+    return left ** right
+
+
+_EXACT_OPERATIONS: Dict[str, Dict[str, Callable[[Number, Number], Number]]] = {
+    DECIMAL_ARITHMETIC: dict(
+        _BINARY_OPERATIONS, **{'/': _decimal_divide, '//': _decimal_floor_divide, '**': _decimal_power}
+    ),
+    FRACTION_ARITHMETIC: dict(
+        _BINARY_OPERATIONS, **{'/': _fraction_divide, '**': _fraction_power}
+    ),
+}
+
+_DECIMAL_LITERALS: Dict[str, Callable[[str], Number]] = {
+    FLOAT_ARITHMETIC: float,
+    DECIMAL_ARITHMETIC: Decimal,
+    FRACTION_ARITHMETIC: Fraction,
+}
+
+
+class ExpressionEvaluator:
+    """Parses expressions into a small AST and evaluates it without eval()."""
+
+    def __init__(self, arithmetic: str = FLOAT_ARITHMETIC, precision: int = DEFAULT_PRECISION,
+                 compiled_cache_size: int = 256, cost_estimator: Optional[CostEstimator] = None):
+        """
+        Initialize the evaluator.
+
+        Integer-only expressions always use native ints. The arithmetic mode
+        decides what division and decimal literals produce.
+
+        Args:
+            arithmetic: 'float' (default), 'decimal' or 'fraction'
+            precision: Significant digits of Decimal results (and of the
+                displayed Decimal/Fraction results)
+            compiled_cache_size: Maximum number of compiled expression shapes
+                kept (0 disables the cache)
+            cost_estimator: Budget that rejects oversized expressions before
+                they are evaluated (the default budget for the mode by default)
+        """
+        if arithmetic not in ARITHMETIC_MODES:
+            raise ValueError(f"unknown arithmetic mode: {arithmetic}")
+        if precision < 1:
+            raise ValueError("precision must be at least 1")
+        self.arithmetic = arithmetic
+        self.precision = precision
+        self._binary_operations = _EXACT_OPERATIONS.get(arithmetic, _BINARY_OPERATIONS)
+        self._parse_decimal_literal = _DECIMAL_LITERALS[arithmetic]
+        self._context = Context(prec=precision) if arithmetic == DECIMAL_ARITHMETIC else None
+        self.cost_estimator = cost_estimator or CostEstimator(
+            exact_fractions=arithmetic == FRACTION_ARITHMETIC,
+            decimal=arithmetic == DECIMAL_ARITHMETIC
+        )
+        # Programs by expression shape (the normalized tokens with every
+        # literal replaced by a placeholder)
+        self.compiled_cache = LRUCache(compiled_cache_size)
+
+    def evaluate(self, expression: str) -> Number:
+        """
+        Parse and evaluate an expression.
+
+        Args:
+            expression: Sanitized expression (digits, + - * / . and parentheses)
+
+        Returns:
+            The numeric result
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+            ZeroDivisionError: If the expression divides by zero
+        """
+        return self.run(self.compile(expression))
+
+    def evaluate_tokens(self, tokens: Sequence[Token]) -> Number:
+        """
+        Evaluate an expression already split by ExpressionValidator.tokenize.
+
+        Args:
+            tokens: Tokens of the expression
+
+        Returns:
+            The numeric result
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+            ZeroDivisionError: If the expression divides by zero
+        """
+        return self.run(self.compile_tokens(tokens))
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """
+        Compile an expression, reusing the program of expressions with the same shape.
+
+        Args:
+            expression: Sanitized expression to compile
+
+        Returns:
+            The compiled expression
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+        """
+        return self.compile_tokens(ExpressionValidator.tokenize(expression))
+
+    def compile_tokens(self, tokens: Sequence[Token]) -> CompiledExpression:
+        """
+        Compile tokens, reusing the program of expressions with the same shape.
+
+        Expressions that differ only in their literals (e.g. "2+3" and
+        "4+5"), whitespace or display symbols share one program, which
+        loads the literals instead of folding them, and skip parsing
+        entirely. Expressions whose cost has to be estimated depend on
+        their literals: they are compiled with constants folded, every time.
+
+        Args:
+            tokens: Tokens returned by ExpressionValidator.tokenize
+
+        Returns:
+            The compiled expression
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+        """
+        if not self.cost_estimator.is_trivially_cheap(ExpressionValidator.normalize_tokens(tokens)):
+            return self.compile_tree(self.parse_tokens(tokens))
+
+        literals = [self._parse_number(number) for number, _, _ in tokens if number]
+        shape = " ".join(["#" if number else name or symbol for number, name, symbol in tokens])
+        program = self.compiled_cache.get(shape)
+        if program is None:
+            program = tuple(self._parse(tokens, shape=True))
+            self.compiled_cache.put(shape, program)
+        return CompiledExpression(program, literals)
+
+    def parse(self, expression: str, variable: Optional[str] = None) -> ExpressionNode:
+        """
+        Parse an expression into an expression tree, validating it on the way.
+
+        Args:
+            expression: Sanitized expression to parse
+            variable: Name accepted as a variable (no names are accepted by default)
+
+        Returns:
+            Root node of the expression tree
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+        """
+        return self.parse_tokens(ExpressionValidator.tokenize(expression), variable)
+
+    def parse_tokens(self, tokens: Sequence[Token], variable: Optional[str] = None) -> ExpressionNode:
+        """
+        Parse tokens into an expression tree, validating the grammar on the way.
+
+        Args:
+            tokens: Tokens returned by ExpressionValidator.tokenize
+            variable: Name accepted as a variable (no names are accepted by default)
+
+        Returns:
+            Root node of the expression tree
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+        """
+        return self._parse(tokens, variable)[0]
+
+    def _parse(self, tokens: Sequence[Token], variable: Optional[str] = None,
+               shape: bool = False) -> list:
+        """
+        Parse tokens with the shunting-yard algorithm, validating the grammar.
+
+        Args:
+            tokens: Tokens returned by ExpressionValidator.tokenize
+            variable: Name accepted as a variable
+            shape: Emit the postfix program of the expression's shape, with
+                LOAD instructions for its literals, instead of building a tree
+
+        Returns:
+            The root node of the tree, alone in a list; or the program
+
+        Raises:
+            InvalidExpressionError: If the expression is not valid
+        """
+        reduce = self._reduce_postfix if shape else self._reduce
+        # Subtrees, or the program emitted so far (operands are emitted in order)
+        operands: list = []
+        # Pending operators as (symbol, is_unary)
+        operators: List[Tuple[str, bool]] = []
+        expect_operand = True
+        literal_count = 0
+
+        for number, name, symbol in tokens:
+            if name and name != variable:
+                raise InvalidExpressionError(f"Nome desconhecido: {name}")
+            if expect_operand:
+                if number:
+                    if shape:
+                        operands.append((LOAD, literal_count))
+                        literal_count += 1
+                    else:
+                        operands.append(NumberNode(self._parse_number(number)))
+                    expect_operand = False
+                elif name:
+                    operands.append(VariableNode(name))
+                    expect_operand = False
+                elif symbol == '(':
+                    operators.append((symbol, False))
+                elif symbol in _UNARY_OPERATIONS:
+                    operators.append((symbol, True))
+                else:
+                    raise InvalidExpressionError(f"Símbolo inesperado: {symbol}")
+            elif symbol == ')':
+                while operators and operators[-1][0] != '(':
+                    reduce(operands, operators.pop())
+                if not operators:
+                    raise InvalidExpressionError("Parêntese sem abertura")
+                operators.pop()
+            elif symbol in _BINARY_PRECEDENCE:
+                while operators and self._should_reduce(operators[-1], symbol):
+                    reduce(operands, operators.pop())
+                operators.append((symbol, False))
+                expect_operand = True
+            else:
+                raise InvalidExpressionError(f"Símbolo inesperado: {number or name or symbol}")
+
+        if expect_operand:
+            raise InvalidExpressionError("Expressão incompleta")
+
+        while operators:
+            pending = operators.pop()
+            if pending[0] == '(':
+                raise InvalidExpressionError("Parêntese sem fechamento")
+            reduce(operands, pending)
+
+        return operands
+
+    def evaluate_tree(self, node: ExpressionNode) -> Number:
+        """
+        Evaluate a parsed expression tree.
+
+        Args:
+            node: Root node of the expression tree
+
+        Returns:
+            The numeric result
+
+        Raises:
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+        """
+        return self.run(self.compile_tree(node))
+
+    def compile_tree(self, node: ExpressionNode) -> CompiledExpression:
+        """
+        Compile a parsed expression tree into a postfix program.
+
+        Constant sub-expressions are evaluated once here, and redundant
+        signs (+x, --x) are dropped. Sub-expressions that raise (e.g. a
+        division by zero) are kept, so evaluating the program raises the
+        same error.
+
+        Args:
+            node: Root node of the expression tree
+
+        Returns:
+            The compiled expression
+
+        Raises:
+            InvalidExpressionError: If the tree contains a variable
+            ExpressionTooCostlyError: If the estimated cost exceeds the budget
+        """
+        self.cost_estimator.check(node)
+        if self._context is not None:
+            # Decimal constants are folded with the evaluator's precision
+            with localcontext(self._context):
+                return CompiledExpression(self._emit(self._fold(node)))
+        return CompiledExpression(self._emit(self._fold(node)))
+
+    def run(self, compiled: CompiledExpression) -> Number:
+        """
+        Evaluate a compiled expression.
+
+        Args:
+            compiled: Expression returned by compile, compile_tokens or compile_tree
+
+        Returns:
+            The numeric result
+
+        Raises:
+            ZeroDivisionError: If the expression divides by zero
+            InvalidExpressionError: If a Decimal operation has no result
+                (e.g. a fractional power of a negative number)
+            ExpressionTooCostlyError: If a Decimal result exceeds its exponent range
+        """
+        if compiled.is_constant:
+            return compiled.program[0][1]
+        if self._context is not None:
+            # Decimal operators use the thread's context: apply the precision
+            with localcontext(self._context):
+                try:
+                    return self._run(compiled.program, compiled.literals)
+                except DecimalException as e:
+                    raise _decimal_error(e) from None
+        return self._run(compiled.program, compiled.literals)
+
+    @staticmethod
+    def _run(program: Sequence[Instruction], literals: Sequence[Number]) -> Number:
+        """Execute a postfix program on a value stack."""
+        values: List[Number] = []
+        for opcode, argument in program:
+            if opcode == LOAD:
+                values.append(literals[argument])
+            elif opcode == PUSH:
+                values.append(argument)
+            elif opcode == BINARY:
+                right = values.pop()
+                values[-1] = argument(values[-1], right)
+            else:
+                values[-1] = argument(values[-1])
+        return values[0]
+
+    def _fold(self, node: ExpressionNode) -> ExpressionNode:
+        """Rebuild a tree with its constant sub-expressions evaluated."""
+        results: List[ExpressionNode] = []
+        stack: List[Tuple[ExpressionNode, bool]] = [(node, False)]
+
+        while stack:
+            current, children_done = stack.pop()
+            if isinstance(current, NumberNode):
+                results.append(current)
+            elif isinstance(current, VariableNode):
+                raise InvalidExpressionError(f"Variável sem valor: {current.name}")
+            elif children_done:
+                self._reduce_folding(results, (current.operator, isinstance(current, UnaryOpNode)))
+            else:
+                stack.append((current, True))
+                if isinstance(current, UnaryOpNode):
+                    stack.append((current.operand, False))
+                else:
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+
+        return results[0]
+
+    def _reduce_folding(self, operands: List[ExpressionNode], pending: Tuple[str, bool]) -> None:
+        """Like _reduce, but evaluate the operation when its operands are constants."""
+        symbol, is_unary = pending
+        if is_unary:
+            operand = operands.pop()
+            if isinstance(operand, NumberNode):
+                operands.append(NumberNode(_UNARY_OPERATIONS[symbol](operand.value)))
+            elif self._context is not None:
+                # Decimal signs round to the context precision: never dropped
+                operands.append(UnaryOpNode(symbol, operand))
+            elif symbol == '+':
+                operands.append(operand)
+            elif isinstance(operand, UnaryOpNode) and operand.operator == '-':
+                operands.append(operand.operand)
+            else:
+                operands.append(UnaryOpNode(symbol, operand))
+            return
+        right = operands.pop()
+        left = operands.pop()
+        if isinstance(left, NumberNode) and isinstance(right, NumberNode):
+            try:
+                operands.append(NumberNode(self._binary_operations[symbol](left.value, right.value)))
+                return
+            except Exception:
+                # Not folded: every evaluation raises the error, as before
+                pass
+        operands.append(BinaryOpNode(symbol, left, right))
+
+    def _emit(self, node: ExpressionNode) -> Tuple[Instruction, ...]:
+        """Linearize a folded tree into postfix instructions."""
+        binary_operations = self._binary_operations
+        program: List[Instruction] = []
+        stack: List[Tuple[ExpressionNode, bool]] = [(node, False)]
+
+        while stack:
+            current, children_done = stack.pop()
+            if isinstance(current, NumberNode):
+                program.append((PUSH, current.value))
+            elif children_done:
+                if isinstance(current, UnaryOpNode):
+                    program.append((UNARY, _UNARY_OPERATIONS[current.operator]))
+                else:
+                    program.append((BINARY, binary_operations[current.operator]))
+            else:
+                stack.append((current, True))
+                if isinstance(current, UnaryOpNode):
+                    stack.append((current.operand, False))
+                else:
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+
+        return tuple(program)
+
+    def _parse_number(self, literal: str) -> Number:
+        """
+        Convert a number literal keeping whole literals as int.
+
+        Raises:
+            InvalidExpressionError: If the literal has more digits than Python
+                converts to int (sys.get_int_max_str_digits()), as whole
+                numbers and as fractions
+        """
+        try:
+            if '.' in literal:
+                return self._parse_decimal_literal(literal)
+            return int(literal)
+        except ValueError:
+            raise InvalidExpressionError(
+                f"Número com dígitos demais: {len(literal)} (máximo {sys.get_int_max_str_digits()})"
+            ) from None
+
+    @staticmethod
+    def _should_reduce(pending: Tuple[str, bool], incoming: str) -> bool:
+        """Check whether the pending operator binds before the incoming one."""
+        symbol, is_unary = pending
+        if symbol == '(':
+            return False
+        pending_precedence = _UNARY_PRECEDENCE if is_unary else _BINARY_PRECEDENCE[symbol]
+        incoming_precedence = _BINARY_PRECEDENCE[incoming]
+        if incoming in _RIGHT_ASSOCIATIVE:
+            return pending_precedence > incoming_precedence
+        return pending_precedence >= incoming_precedence
+
+    def _reduce_postfix(self, program: List[Instruction], pending: Tuple[str, bool]) -> None:
+        """Emit the instruction of a pending operator (its operands are already emitted)."""
+        symbol, is_unary = pending
+        if is_unary:
+            program.append((UNARY, _UNARY_OPERATIONS[symbol]))
+        else:
+            program.append((BINARY, self._binary_operations[symbol]))
+
+    @staticmethod
+    def _reduce(operands: List[ExpressionNode], pending: Tuple[str, bool]) -> None:
+        """Combine the top operand(s) with a pending operator into a node."""
+        symbol, is_unary = pending
+        if is_unary:
+            operands.append(UnaryOpNode(symbol, operands.pop()))
+            return
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(BinaryOpNode(symbol, left, right))
@@ -0,0 +1,143 @@
+"""
+History Search Index - incremental trigram index over the history.
+Following Single Responsibility Principle - only answers substring searches.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+from models.calculation_entry import CalculationEntry
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Get every three-character substring of a text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistorySearchIndex:
+    """
+    Trigram index answering case-insensitive substring queries.
+
+    Entries are indexed in insertion order and removed oldest first (or,
+    to reorder the latest ones, newest first), which matches how the
+    history grows and evicts. Lowercased expression and
+    result keys are computed once, when an entry is added.
+    """
+
+    def __init__(self, entries: Iterable[CalculationEntry] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            entries: Initial entries, oldest first
+        """
+        # Sequence number -> (entry, lowercased expression, lowercased result)
+        self._entries: Dict[int, Tuple[CalculationEntry, str, str]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._next_sequence = 0
+        self._oldest_sequence = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: CalculationEntry) -> None:
+        """
+        Index a new (most recent) entry.
+
+        Args:
+            entry: The entry to index
+        """
+        sequence = self._next_sequence
+        self._next_sequence += 1
+
+        expression_key = entry.expression.lower()
+        result_key = entry.result.lower()
+        self._entries[sequence] = (entry, expression_key, result_key)
+        for trigram in _trigrams(expression_key) | _trigrams(result_key):
+            self._postings[trigram].add(sequence)
+
+    def remove_oldest(self, count: int = 1) -> None:
+        """
+        Remove the oldest indexed entries.
+
+        Args:
+            count: Number of entries to remove
+        """
+        for _ in range(min(count, len(self._entries))):
+            self._remove(self._oldest_sequence)
+            self._oldest_sequence += 1
+
+    def remove_newest(self, count: int = 1) -> None:
+        """
+        Remove the most recently indexed entries.
+
+        Args:
+            count: Number of entries to remove
+        """
+        for _ in range(min(count, len(self._entries))):
+            self._next_sequence -= 1
+            self._remove(self._next_sequence)
+
+    def _remove(self, sequence: int) -> None:
+        """Remove one indexed entry and its postings."""
+        _, expression_key, result_key = self._entries.pop(sequence)
+        for trigram in _trigrams(expression_key) | _trigrams(result_key):
+            postings = self._postings[trigram]
+            postings.discard(sequence)
+            if not postings:
+                del self._postings[trigram]
+
+    def clear(self) -> None:
+        """Remove every entry from the index."""
+        self._entries.clear()
+        self._postings.clear()
+        self._oldest_sequence = self._next_sequence
+
+    def rebuild(self, entries: Iterable[CalculationEntry]) -> None:
+        """
+        Replace the indexed entries.
+
+        Args:
+            entries: The new entries, oldest first
+        """
+        self.clear()
+        for entry in entries:
+            self.add(entry)
+
+    def search(self, query: str) -> List[CalculationEntry]:
+        """
+        Find the entries whose expression or result contains the query.
+
+        Matches exactly what `query.lower() in expression.lower() or
+        query.lower() in result.lower()` would select, in chronological order.
+
+        Args:
+            query: String to search for
+
+        Returns:
+            List of matching calculation entries
+        """
+        query_lower = query.lower()
+
+        if len(query_lower) < 3:
+            # Too short for trigrams: scan the precomputed keys
+            return [
+                entry for entry, expression_key, result_key in self._entries.values()
+                if query_lower in expression_key or query_lower in result_key
+            ]
+
+        postings = []
+        for trigram in _trigrams(query_lower):
+            trigram_postings = self._postings.get(trigram)
+            if not trigram_postings:
+                return []
+            postings.append(trigram_postings)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        matches = []
+        for sequence in sorted(candidates):
+            entry, expression_key, result_key = self._entries[sequence]
+            if query_lower in expression_key or query_lower in result_key:
+                matches.append(entry)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._entries)
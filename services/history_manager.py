@@ -4,24 +4,84 @@ Following Single Responsibility Principle - only manages calculation history.
 """
 import json
 import os
-from typing import List, Optional
+from collections import Counter
+from contextlib import nullcontext
+from json.encoder import encode_basestring
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
 from models.calculation_entry import CalculationEntry
+from services.background_writer import BackgroundWriter
+from services.history_index import HistorySearchIndex
+from utils.file_lock import FileLock
+from utils.file_permissions import match_replaced_mode
+from utils.metrics import metrics
+from utils.ring_buffer import RingBuffer
+
+# Saves prepared without the file lock before one is done entirely under it
+_OPTIMISTIC_SAVES = 3
+
+# Identity of a version of the history file: (inode, mtime in ns, size)
+FileVersion = Optional[Tuple[int, int, int]]
+Record = Dict[str, Any]
+
+
+def _record_key(record: Record) -> Tuple[Any, Any, Any]:
+    """Identify a record by what it holds (records have no id)."""
+    return record.get('timestamp'), record.get('expression'), record.get('result')
+
+
+def _file_version(stat_result: os.stat_result) -> FileVersion:
+    """
+    Identify a file version.
+    
+    Saves replace the file (new inode) and appends grow it (new size). The
+    file read is kept open until its version is checked, so its inode cannot
+    be reused by another file in the meantime.
+    """
+    return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
 
 
 class HistoryManager:
-    """Manages the calculation history with persistence capabilities."""
+    """
+    Manages the calculation history with persistence capabilities.
+
+    Several processes (e.g. two calculator windows) may share the history
+    file: saves merge the calculations added since the last save into the
+    file as it is on disk, so no process drops the others' entries.
+    """
     
-    def __init__(self, history_file: str = "calculator_history.json"):
+    def __init__(self, history_file: str = "calculator_history.json",
+                 write_behind: bool = False, max_write_delay: float = 0.5,
+                 autoload: bool = True):
         """
         Initialize the history manager.
         
         Args:
             history_file: Path to the file where history will be stored
+            write_behind: Persist on a background thread instead of inside
+                add_calculation (call flush() or close() before exiting)
+            max_write_delay: Longest time (seconds) a background save may be
+                deferred; additions inside that window share one save
+            autoload: Load the history file now; pass False to call
+                load_history() later (e.g. after the first frame is drawn)
         """
         self.history_file = history_file
-        self._history: List[CalculationEntry] = []
         self._max_entries = 100  # Limit history to prevent excessive memory usage
-        self.load_history()
+        self._history = RingBuffer(self._max_entries)
+        self._index = HistorySearchIndex()
+        self._history_lock = threading.RLock()  # Guards _history against the writer thread
+        self._io_lock = threading.RLock()  # Serializes writes to the history file
+        # Lock order: _io_lock, then _history_lock (never the other way around)
+        self._file_lock = FileLock(history_file)  # Serializes them across processes
+        self._file_version: FileVersion = None  # Version last loaded or saved by us
+        self._file_records: Optional[List[Record]] = None  # Its records, when known
+        self._unsaved: List[CalculationEntry] = []  # Added since the last save
+        self._writer: Optional[BackgroundWriter] = None
+        if autoload:
+            self.load_history()
+        if write_behind:
+            self._writer = BackgroundWriter(self._flush_pending, max_write_delay)
     
     def add_calculation(self, expression: str, result: str) -> None:
         """
@@ -32,19 +92,76 @@ class HistoryManager:
             result: The calculated result
         """
         entry = CalculationEntry(expression, result)
-        self._history.append(entry)
+        with metrics.time('add_calculation'):
+            with self._history_lock:
+                # The ring buffer drops the oldest entry once max_entries is reached
+                if self._history.append(entry) is not None:
+                    self._index.remove_oldest()
+                self._index.add(entry)
+                self._unsaved.append(entry)
+            # Saves take _io_lock before _history_lock: never call them with the latter held
+            self._persist_entry(entry)
+    
+    def set_max_entries(self, max_entries: int) -> None:
+        """
+        Change how many calculations are kept, dropping the oldest if needed.
+        
+        Args:
+            max_entries: New maximum number of entries (at least 1)
+        """
+        with self._history_lock:
+            evicted = self._history.resize(max_entries)
+            self._index.remove_oldest(len(evicted))
+            self._max_entries = max_entries
+    
+    def _set_entries(self, entries: Iterable[CalculationEntry]) -> None:
+        """
+        Replace the in-memory history, keeping only the last max_entries.
         
-        # Keep only the last max_entries calculations
-        if len(self._history) > self._max_entries:
-            self._history = self._history[-self._max_entries:]
+        Args:
+            entries: The new entries, oldest first
+        """
+        with self._history_lock:
+            self._history = RingBuffer(self._max_entries, entries)
+            self._index.rebuild(self._history)
+    
+    def _persist_entry(self, entry: CalculationEntry) -> None:
+        """
+        Persist a newly added entry, now or on the background writer.
         
+        Args:
+            entry: The entry that was just added (already queued in _unsaved)
+        """
+        if self._writer:
+            self._writer.schedule()
+        else:
+            self._flush_pending()
+    
+    def _flush_pending(self) -> None:
+        """
+        Write every change not yet on disk.
+        
+        The JSON file can only be rewritten as a whole; storage backends
+        that support appending override this.
+        """
         self.save_history()
     
-    def get_history(self) -> List[CalculationEntry]:
-        """Get all calculation entries in chronological order."""
-        return self._history.copy()
+    def flush(self) -> None:
+        """Block until every added calculation has been written."""
+        if self._writer:
+            self._writer.flush()
+    
+    def close(self) -> None:
+        """Write pending changes and stop the background writer, if any."""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
     
-    def get_recent_history(self, count: int = 10) -> List[CalculationEntry]:
+    def get_history(self) -> Sequence[CalculationEntry]:
+        """Get a read-only view of all calculation entries in chronological order."""
+        return self._history.view()
+    
+    def get_recent_history(self, count: int = 10) -> Sequence[CalculationEntry]:
         """
         Get the most recent calculations.
         
@@ -52,40 +169,342 @@ class HistoryManager:
             count: Number of recent entries to return
             
         Returns:
-            List of recent calculation entries
+            Read-only view of the recent calculation entries
         """
-        return self._history[-count:] if self._history else []
+        return self._history.view()[-count:] if self._history else []
     
     def clear_history(self) -> None:
-        """Clear all history entries."""
-        self._history.clear()
-        self.save_history()
+        """Clear all history entries (the other processes' entries too)."""
+        with self._history_lock:
+            self._history.clear()
+            self._index.clear()
+            self._unsaved.clear()
+        with self._io_lock:
+            try:
+                temp_file = self._write_temp_file([])
+                with self._file_lock:
+                    self._replace_file(temp_file)
+                    self._file_records = []
+            except Exception as e:
+                print(f"Error saving history: {e}")
     
     def get_last_calculation(self) -> Optional[CalculationEntry]:
         """Get the most recent calculation entry."""
         return self._history[-1] if self._history else None
     
     def save_history(self) -> None:
-        """Save the history to a file."""
-        try:
-            history_data = [entry.to_dict() for entry in self._history]
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving history: {e}")
+        """Merge the calculations added since the last save into the history file."""
+        self._save_merged()
     
-    def load_history(self) -> None:
-        """Load the history from a file."""
-        if not os.path.exists(self.history_file):
+    def _save_merged(self, durable: bool = False) -> Optional[List[Record]]:
+        """
+        Merge the unsaved entries into the file as it is on disk, and replace it.
+        
+        The file is read, merged and encoded without the inter-process lock;
+        the lock only covers checking that the file is still the version that
+        was read and renaming the new one into place. If another process saved
+        in between, the merge is redone, the last time entirely under the lock.
+        When other processes added entries, they are loaded into memory too.
+        
+        Args:
+            durable: fsync the new file before it replaces the old one
+            
+        Returns:
+            The records now in the file, or None if the save failed (the
+            unsaved entries are then kept for the next save)
+        """
+        with self._io_lock:
+            with self._history_lock:
+                unsaved, self._unsaved = self._unsaved, []
+            known_version = self._file_version
+            known_records = self._file_records
+            new_records = [entry.to_dict() for entry in unsaved]
+            try:
+                with metrics.time('save_history'):
+                    for attempt in range(_OPTIMISTIC_SAVES + 1):
+                        if attempt < _OPTIMISTIC_SAVES:
+                            saved, version, records = self._save_attempt(new_records, durable)
+                        else:
+                            # Heavy contention: merge while holding the lock
+                            with self._file_lock:
+                                saved, version, records = self._save_attempt(new_records, durable,
+                                                                             locked=True)
+                        if saved:
+                            break
+                    else:
+                        raise RuntimeError("the history file changed while it was saved")
+            except Exception as e:
+                with self._history_lock:
+                    self._unsaved[:0] = unsaved
+                print(f"Error saving history: {e}")
+                return None
+            
+            if version != known_version:
+                # Another process saved since we last did: show its entries too
+                self._load_merged(records, known_records, new_records)
+            return records
+    
+    def _load_merged(self, records: List[Record], known_records: Optional[List[Record]],
+                     new_records: List[Record]) -> None:
+        """
+        Bring the in-memory history up to date with a merged save.
+        
+        Only the other processes' records are decoded and inserted into the
+        history and its index. They are rebuilt from the file instead when
+        the file lost records to something other than trimming (e.g. it was
+        cleared) or the records of the previous version are not known.
+        
+        Args:
+            records: The records now in the file
+            known_records: The records of the version we last loaded or saved, if known
+            new_records: Our records that were merged into the file
+        """
+        foreign = self._foreign_records(records, known_records, new_records)
+        with self._history_lock:
+            if foreign is None:
+                self._set_entries(self._entries_from_records(records) + self._unsaved)
+            else:
+                self._insert_entries(self._entries_from_records(foreign))
+    
+    def _insert_entries(self, entries: List[CalculationEntry]) -> None:
+        """
+        Insert entries into the history in timestamp order (history lock held).
+        
+        Only our latest entries that are newer than the inserted ones are
+        taken out and appended again, in order, with them.
+        
+        Args:
+            entries: The entries to insert
+        """
+        if not entries:
             return
+        entries.sort(key=lambda entry: entry.iso_timestamp)
+        oldest = entries[0].iso_timestamp
+        newer = 0
+        for entry in reversed(self._history.view()):
+            if entry.iso_timestamp <= oldest:
+                break
+            newer += 1
+        later_entries = self._history.remove_newest(newer)
+        self._index.remove_newest(len(later_entries))
+        for entry in sorted(entries + later_entries, key=lambda entry: entry.iso_timestamp):
+            if self._history.append(entry) is not None:
+                self._index.remove_oldest()
+            self._index.add(entry)
+    
+    def _foreign_records(self, records: List[Record], known_records: Optional[List[Record]],
+                         new_records: List[Record]) -> Optional[List[Record]]:
+        """
+        Find the records other processes saved since the version we knew.
         
+        Args:
+            records: The records now in the file
+            known_records: The records of the version we last loaded or saved, if known
+            new_records: Our records that were merged into the file
+            
+        Returns:
+            Those records, oldest first; None if the known records are not at
+            hand, or some were removed other than by trimming the file
+        """
+        if known_records is None:
+            return None
+        try:
+            ours = Counter(map(_record_key, known_records))
+            ours.update(map(_record_key, new_records))
+            foreign = []
+            for record in records:
+                key = _record_key(record)
+                if ours[key]:
+                    ours[key] -= 1
+                else:
+                    foreign.append(record)
+        except (AttributeError, TypeError):
+            return None  # Not a list of flat records: rebuild from what can be read
+        if (len(records) - len(foreign) < len(known_records) + len(new_records)
+                and len(records) < self._max_entries):
+            return None
+        return foreign
+    
+    @staticmethod
+    def _entries_from_records(records: Iterable[Record]) -> List[CalculationEntry]:
+        """Decode records into entries, skipping unreadable ones."""
+        entries = []
+        for record in records:
+            try:
+                entries.append(CalculationEntry.from_dict(record))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Error loading history: {e}")
+        return entries
+    
+    def _save_attempt(self, new_records: List[Record], durable: bool,
+                      locked: bool = False) -> Tuple[bool, FileVersion, List[Record]]:
+        """
+        Merge the new records into the file, replacing it unless another process saved first.
+        
+        Args:
+            new_records: Records of the entries added since the last save
+            durable: fsync the new file before it replaces the old one
+            locked: Whether the caller already holds the file lock
+            
+        Returns:
+            Whether the file was replaced, the version that was read and the
+            merged records
+        """
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-                self._history = [CalculationEntry.from_dict(data) for data in history_data]
-        except Exception as e:
+            f = open(self.history_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            f = None
+        try:
+            version = self._opened_version(f) if f else None
+            if version is None:
+                records = []
+            elif version == self._file_version and self._file_records is not None:
+                # Nobody wrote since we did: no need to decode the file
+                records = self._file_records
+            else:
+                records = self._read_records(f)
+            if new_records:
+                if records and new_records[0].get('timestamp', '') < records[-1].get('timestamp', ''):
+                    # Interleave with the other processes' entries by time (stable sort)
+                    records = sorted(records + new_records,
+                                     key=lambda record: record.get('timestamp', ''))
+                else:
+                    records = records + new_records
+            records = records[-self._max_entries:]
+            temp_file = self._write_temp_file(records, durable)
+            
+            with nullcontext() if locked else self._file_lock:
+                if self._current_version() != version:
+                    os.remove(temp_file)
+                    return False, version, records
+                self._replace_file(temp_file)
+                self._file_records = records
+                return True, version, records
+        finally:
+            if f:
+                f.close()
+    
+    def _replace_file(self, temp_file: str) -> None:
+        """Atomically replace the history file (lock held) and remember the new version."""
+        try:
+            os.replace(temp_file, self.history_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+        self._file_version = self._current_version()
+        self._file_records = None
+    
+    @staticmethod
+    def _opened_version(f) -> FileVersion:
+        """Version of an open history file."""
+        return _file_version(os.fstat(f.fileno()))
+    
+    def _current_version(self) -> FileVersion:
+        """Version of the history file now on disk (None if it does not exist)."""
+        try:
+            return _file_version(os.stat(self.history_file))
+        except FileNotFoundError:
+            return None
+    
+    def _write_temp_file(self, records: List[Record], durable: bool = False) -> str:
+        """
+        Write records to a new temporary file next to the history file.
+        
+        Args:
+            records: The records to write
+            durable: fsync the file before returning
+            
+        Returns:
+            Path of the temporary file
+        """
+        directory, name = os.path.split(os.path.abspath(self.history_file))
+        data = self._encode_records(records).encode('utf-8')
+        fd, temp_file = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                match_replaced_mode(f.fileno(), self.history_file)
+                f.write(data)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            os.remove(temp_file)
+            raise
+        metrics.count('history_bytes_written', len(data))
+        return temp_file
+    
+    def _encode_records(self, records: List[Record]) -> str:
+        """
+        Encode records in the file format (a JSON array indented by 2).
+        
+        Records of strings only, as the history writes them, are laid out
+        here exactly as json.dumps(indent=2) would, but with the C string
+        encoder: json.dumps drops to its pure-Python encoder when indenting.
+        """
+        if not records:
+            return "[]"
+        chunks = []
+        for record in records:
+            if (type(record) is not dict or not record
+                    or not all(type(key) is str and type(value) is str
+                               for key, value in record.items())):
+                return json.dumps(records, indent=2, ensure_ascii=False)
+            chunks.append("  {\n    " + ",\n    ".join(
+                f"{encode_basestring(key)}: {encode_basestring(value)}"
+                for key, value in record.items()
+            ) + "\n  }")
+        return "[\n" + ",\n".join(chunks) + "\n]"
+    
+    def _read_records(self, f: TextIO) -> List[Record]:
+        """
+        Read every record of the open history file.
+        
+        Args:
+            f: The history file, open for reading
+            
+        Returns:
+            The records; a corrupt file counts as empty, as when it is loaded
+        """
+        try:
+            records = json.load(f)
+        except ValueError as e:
             print(f"Error loading history: {e}")
-            self._history = []
+            return []
+        return records if isinstance(records, list) else []
+    
+    def load_history(self) -> None:
+        """
+        Load the history from a file.
+        
+        Calculations added before the load and not yet written (e.g. while
+        it was deferred until after startup) are kept, after the loaded ones.
+        """
+        # Held so no save writes the file (and empties _unsaved) during the load
+        with self._io_lock:
+            if not os.path.exists(self.history_file):
+                return
+            
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    version = self._opened_version(f)
+                    history_data = json.load(f)
+                    self._set_loaded_entries([CalculationEntry.from_dict(data) for data in history_data])
+                    self._file_version = version
+                    self._file_records = history_data
+            except Exception as e:
+                print(f"Error loading history: {e}")
+                self._set_loaded_entries([])
+    
+    def _set_loaded_entries(self, entries: List[CalculationEntry]) -> None:
+        """
+        Replace the in-memory history with loaded entries (_io_lock held).
+        
+        Args:
+            entries: The entries read from the file, oldest first; the
+                entries added since and not yet written follow them
+        """
+        with self._history_lock:
+            self._set_entries(entries + self._unsaved)
     
     def search_history(self, query: str) -> List[CalculationEntry]:
         """
@@ -97,11 +516,8 @@ class HistoryManager:
         Returns:
             List of matching calculation entries
         """
-        query_lower = query.lower()
-        return [
-            entry for entry in self._history
-            if query_lower in entry.expression.lower() or query_lower in entry.result.lower()
-        ]
+        with self._history_lock:
+            return self._index.search(query)
     
     def get_history_count(self) -> int:
         """Get the total number of entries in history."""
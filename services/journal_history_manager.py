@@ -0,0 +1,242 @@
+"""
+Journal History Manager - append-only NDJSON persistence for the history.
+Following Single Responsibility Principle - only handles journal persistence.
+"""
+import json
+import os
+from typing import List, Optional, TextIO
+from models.calculation_entry import CalculationEntry
+from services.history_manager import FileVersion, HistoryManager, Record
+from utils.metrics import metrics
+from utils.ring_buffer import RingBuffer
+
+
+class JournalHistoryManager(HistoryManager):
+    """
+    History manager that appends one JSON line per calculation.
+    
+    Appends hold the file lock only while writing lines encoded beforehand,
+    so several processes can share the journal; compaction merges their
+    lines like HistoryManager.save_history.
+    """
+    
+    def __init__(self, history_file: str = "calculator_history.ndjson",
+                 legacy_file: Optional[str] = "calculator_history.json",
+                 compaction_factor: int = 2, write_behind: bool = False,
+                 max_write_delay: float = 0.5, autoload: bool = True):
+        """
+        Initialize the journal history manager.
+        
+        Args:
+            history_file: Path to the NDJSON journal
+            legacy_file: JSON history imported when the journal does not exist yet
+            compaction_factor: The journal is compacted once it holds this many
+                times the maximum number of entries
+            write_behind: Append on a background thread (see HistoryManager)
+            max_write_delay: Longest time (seconds) an append may be deferred
+            autoload: Replay the journal now (see HistoryManager)
+        """
+        self.legacy_file = legacy_file
+        self.compaction_factor = max(1, compaction_factor)
+        self._journal_lines = 0  # Lines in the journal as of _lines_version
+        self._lines_version: FileVersion = None
+        super().__init__(history_file, write_behind, max_write_delay, autoload)
+    
+    def _flush_pending(self) -> None:
+        """Append the queued entries, compacting the journal when it grows too long."""
+        with self._io_lock:
+            with self._history_lock:
+                entries, self._unsaved = self._unsaved, []
+            if not entries:
+                return
+            
+            data = self._encode_records([entry.to_dict() for entry in entries]).encode('utf-8')
+            try:
+                with metrics.time('append_history'), self._file_lock:
+                    current_version = self._current_version()
+                    if current_version != self._lines_version:
+                        # Other processes appended or compacted: count their lines too
+                        self._count_lines(current_version)
+                    with open(self.history_file, 'ab') as f:
+                        f.write(data)
+                    new_version = self._current_version()
+                    if current_version == self._file_version:
+                        # Our own append: not a change from another process
+                        self._file_version = new_version
+                        self._file_records = None
+                    self._journal_lines += len(entries)
+                    self._lines_version = new_version
+                metrics.count('history_bytes_written', len(data))
+            except Exception as e:
+                with self._history_lock:
+                    self._unsaved[:0] = entries
+                print(f"Error saving history: {e}")
+                return
+            
+            if self._journal_lines >= self._max_entries * self.compaction_factor:
+                self.save_history()
+    
+    def save_history(self) -> None:
+        """Compact the journal: atomically rewrite it with its most recent entries."""
+        # The rewrite covers every queued entry as well
+        records = self._save_merged(durable=True)
+        if records is not None:
+            self._journal_lines = len(records)
+            self._lines_version = self._file_version
+    
+    def clear_history(self) -> None:
+        """Clear all history entries, leaving an empty journal."""
+        super().clear_history()
+        self._journal_lines = 0
+        self._lines_version = self._file_version
+    
+    def _count_lines(self, current_version: FileVersion) -> None:
+        """
+        Bring the line count up to date with the journal on disk (file lock held).
+        
+        When the journal only grew since it was counted, only the appended
+        bytes are read; after a compaction by another process, all of it.
+        
+        Args:
+            current_version: Version of the journal now on disk
+        """
+        counted = self._lines_version
+        grown = (counted is not None and current_version is not None
+                 and counted[0] == current_version[0] and counted[2] <= current_version[2])
+        offset = counted[2] if grown else 0
+        lines = self._journal_lines if grown else 0
+        try:
+            with open(self.history_file, 'rb') as f:
+                f.seek(offset)
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    lines += block.count(b"\n")
+        except FileNotFoundError:
+            lines = 0
+        self._journal_lines = lines
+        self._lines_version = current_version
+    
+    def _encode_records(self, records: List[Record]) -> str:
+        """Encode records in the journal format (one JSON line each)."""
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    
+    def _read_records(self, f: TextIO) -> List[Record]:
+        """
+        Read every complete line of the open journal.
+        
+        Args:
+            f: The journal, open for reading
+            
+        Returns:
+            The records; a torn final line (an append in progress, or
+            interrupted by a crash) and unreadable lines are skipped
+        """
+        records = []
+        for line_number, line in enumerate(f, 1):
+            if not line.endswith("\n"):
+                break
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                print(f"Error loading history line {line_number}: {e}")
+        return records
+    
+    def load_history(self) -> None:
+        """
+        Replay the journal, keeping the most recent entries.
+        
+        A torn final line (from a crash in the middle of an append) is
+        dropped and truncated away so later appends start on a clean line.
+        Calculations added before the load and not yet written are kept,
+        after the replayed ones.
+        """
+        # Held so no append writes the journal (and empties _unsaved) during the replay
+        with self._io_lock:
+            if not os.path.exists(self.history_file):
+                self._import_legacy_history()
+                return
+            
+            recent_entries = RingBuffer(self._max_entries)
+            valid_size = 0
+            raw_lines = 0
+            line_count = 0
+            
+            try:
+                with open(self.history_file, 'rb') as f:
+                    version = self._opened_version(f)
+                    for raw_line in f:
+                        if not raw_line.endswith(b"\n"):
+                            break  # torn final line
+                        valid_size += len(raw_line)
+                        raw_lines += 1
+                        if not raw_line.strip():
+                            continue
+                        line_count += 1
+                        try:
+                            data = json.loads(raw_line.decode('utf-8'))
+                            recent_entries.append(CalculationEntry.from_dict(data))
+                        except (ValueError, KeyError, TypeError) as e:
+                            print(f"Error loading history line {line_count}: {e}")
+            
+                self._file_version = version
+                self._file_records = None
+                # Count every line read, blank and unreadable ones too, as appends do
+                self._journal_lines = raw_lines
+                self._lines_version = version
+                if valid_size < os.path.getsize(self.history_file):
+                    self._truncate_torn_line(valid_size)
+            except Exception as e:
+                print(f"Error loading history: {e}")
+            
+            self._set_loaded_entries(recent_entries.to_list())
+    
+    def _truncate_torn_line(self, valid_size: int) -> None:
+        """
+        Cut a torn final line off the journal.
+        
+        What looked torn may be another process's append in progress: under
+        the lock, only a tail that still does not end a line is cut.
+        
+        Args:
+            valid_size: Size of the complete lines that were read
+        """
+        with self._file_lock:
+            with open(self.history_file, 'r+b') as f:
+                f.seek(valid_size)
+                tail = f.read()
+                complete = tail.rfind(b"\n") + 1
+                if complete < len(tail):
+                    f.truncate(valid_size + complete)
+                    self._file_version = self._opened_version(f)
+                    self._file_records = None
+                    if complete == 0:
+                        # Only the torn line was cut: the line count still holds
+                        self._lines_version = self._file_version
+    
+    def _import_legacy_history(self) -> None:
+        """Import the old JSON history file into a new journal."""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        
+        entries = HistoryManager(self.legacy_file).get_history()
+        with self._io_lock:
+            try:
+                temp_file = self._write_temp_file([entry.to_dict() for entry in entries], durable=True)
+                with self._file_lock:
+                    imported = not os.path.exists(self.history_file)
+                    if imported:
+                        self._replace_file(temp_file)
+                    else:
+                        os.remove(temp_file)
+            except Exception as e:
+                print(f"Error saving history: {e}")
+                return
+        
+        if imported:
+            self._set_loaded_entries(list(entries))
+            self._journal_lines = len(entries)
+            self._lines_version = self._file_version
+        else:
+            # Another process imported it first
+            self.load_history()
@@ -0,0 +1,260 @@
+"""
+SQLite History Manager - indexed, large-scale persistence for the history.
+Following Single Responsibility Principle - only handles SQLite persistence.
+"""
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+from models.calculation_entry import CalculationEntry
+from services.history_manager import HistoryManager
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expression TEXT NOT NULL,
+    result TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_expression ON history (expression);
+"""
+
+# Trigram full-text index kept in sync by triggers (needs SQLite 3.34+)
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_search USING fts5(
+    expression, result, content='history', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS history_search_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_search (rowid, expression, result)
+    VALUES (new.id, new.expression, new.result);
+END;
+CREATE TRIGGER IF NOT EXISTS history_search_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_search (history_search, rowid, expression, result)
+    VALUES ('delete', old.id, old.expression, old.result);
+END;
+"""
+
+_COLUMNS = "expression, result, timestamp"
+
+
+class SQLiteHistoryManager(HistoryManager):
+    """History manager backed by an indexed SQLite database."""
+
+    def __init__(self, history_file: str = "calculator_history.db",
+                 max_entries: int = 1_000_000, batch_size: int = 1):
+        """
+        Initialize the SQLite history manager.
+
+        Args:
+            history_file: Path to the SQLite database
+            max_entries: Number of most recent entries retained
+            batch_size: Number of calculations buffered before they are
+                inserted in one transaction (reads always see buffered entries)
+        """
+        self.batch_size = max(1, batch_size)
+        self._pending: List[CalculationEntry] = []
+        self._connection: Optional[sqlite3.Connection] = None
+        self._has_search_index = False
+        self._count = 0
+        super().__init__(history_file)
+        self._max_entries = max_entries
+
+    def _persist_entry(self, entry: CalculationEntry) -> None:
+        """Buffer the entry, inserting the buffer once it reaches batch_size."""
+        self._pending.append(entry)
+        if len(self._pending) >= self.batch_size:
+            self.save_history()
+
+    def add_calculation(self, expression: str, result: str) -> None:
+        """
+        Add a new calculation to the history.
+
+        Args:
+            expression: The mathematical expression
+            result: The calculated result
+        """
+        self._persist_entry(CalculationEntry(expression, result))
+
+    def set_max_entries(self, max_entries: int) -> None:
+        """
+        Change how many calculations are retained (applied on the next insert).
+
+        Args:
+            max_entries: New maximum number of entries
+        """
+        self._max_entries = max_entries
+
+    def get_history(self) -> List[CalculationEntry]:
+        """Get all retained calculation entries in chronological order."""
+        return self._query(f"SELECT {_COLUMNS} FROM history ORDER BY id")
+
+    def get_recent_history(self, count: int = 10) -> List[CalculationEntry]:
+        """
+        Get the most recent calculations.
+
+        Args:
+            count: Number of recent entries to return
+
+        Returns:
+            List of recent calculation entries
+        """
+        if count <= 0:
+            return []
+        entries = self._query(
+            f"SELECT {_COLUMNS} FROM history ORDER BY id DESC LIMIT ?", (count,)
+        )
+        entries.reverse()
+        return entries
+
+    def get_history_between(self, start: datetime, end: datetime) -> List[CalculationEntry]:
+        """
+        Get the calculations performed in a time interval.
+
+        Args:
+            start: Beginning of the interval (inclusive)
+            end: End of the interval (inclusive)
+
+        Returns:
+            List of matching calculation entries in chronological order
+        """
+        return self._query(
+            f"SELECT {_COLUMNS} FROM history WHERE timestamp BETWEEN ? AND ? "
+            "ORDER BY timestamp, id",
+            (start.isoformat(), end.isoformat())
+        )
+
+    def clear_history(self) -> None:
+        """Clear all history entries."""
+        self._pending.clear()
+        try:
+            with self._connection:
+                self._connection.execute("DELETE FROM history")
+            self._count = 0
+        except sqlite3.Error as e:
+            print(f"Error clearing history: {e}")
+
+    def get_last_calculation(self) -> Optional[CalculationEntry]:
+        """Get the most recent calculation entry."""
+        recent = self.get_recent_history(1)
+        return recent[0] if recent else None
+
+    def save_history(self) -> None:
+        """Insert the buffered entries in one transaction and apply retention."""
+        if not self._pending:
+            return
+
+        rows = [(e.expression, e.result, e.iso_timestamp) for e in self._pending]
+        try:
+            with self._connection:
+                cursor = self._connection.executemany(
+                    "INSERT INTO history (expression, result, timestamp) VALUES (?, ?, ?)",
+                    rows
+                )
+                self._count += len(rows)
+                if self._count > self._max_entries:
+                    # Ids only grow and old rows are removed from the bottom,
+                    # so the retained window is a contiguous id range.
+                    last_id = self._connection.execute("SELECT MAX(id) FROM history").fetchone()[0]
+                    cursor = self._connection.execute(
+                        "DELETE FROM history WHERE id <= ?", (last_id - self._max_entries,)
+                    )
+                    self._count -= cursor.rowcount
+            self._pending.clear()
+        except sqlite3.Error as e:
+            print(f"Error saving history: {e}")
+
+    def load_history(self) -> None:
+        """
+        Open the database, creating the schema if needed.
+        
+        If it cannot be opened, the history is kept in an in-memory database
+        instead (lost on exit), as the JSON history keeps working in memory
+        when its file cannot be read.
+        """
+        try:
+            self._open(self.history_file)
+        except sqlite3.Error as e:
+            print(f"Error loading history: {e} (the history will only be kept in memory)")
+            self._open(":memory:")
+
+    def _open(self, database: str) -> None:
+        """Connect to a database and prepare its schema, closing it on failure."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        connection = sqlite3.connect(database, check_same_thread=False)
+        try:
+            # SQLite's lower() only folds ASCII: search with Python's, like the other backends
+            connection.create_function("py_lower", 1, str.lower, deterministic=True)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            try:
+                connection.executescript(_SEARCH_SCHEMA)
+                self._has_search_index = True
+            except sqlite3.OperationalError:
+                self._has_search_index = False  # no FTS5 trigram support
+            self._count = connection.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        except BaseException:
+            connection.close()
+            raise
+        self._connection = connection
+
+    def search_history(self, query: str) -> List[CalculationEntry]:
+        """
+        Search for calculations containing the query string.
+
+        Args:
+            query: String to search for in expressions or results
+
+        Returns:
+            List of matching calculation entries
+        """
+        query_lower = query.lower()
+        if not query_lower:
+            return self.get_history()
+
+        substring_filter = "(instr(py_lower(h.expression), ?) > 0 OR instr(py_lower(h.result), ?) > 0)"
+        if self._has_search_index and len(query_lower) >= 3 and query_lower.isascii():
+            # The trigram index narrows the candidates; instr keeps the
+            # exact case-insensitive substring semantics. The index folds
+            # case its own way, so it is only trusted for ASCII queries.
+            phrase = '"' + query_lower.replace('"', '""') + '"'
+            return self._query(
+                f"SELECT h.expression, h.result, h.timestamp FROM history h "
+                f"JOIN history_search s ON s.rowid = h.id "
+                f"WHERE history_search MATCH ? AND {substring_filter} ORDER BY h.id",
+                (phrase, query_lower, query_lower)
+            )
+        return self._query(
+            f"SELECT h.expression, h.result, h.timestamp FROM history h "
+            f"WHERE {substring_filter} ORDER BY h.id",
+            (query_lower, query_lower)
+        )
+
+    def get_history_count(self) -> int:
+        """Get the total number of entries in history."""
+        self.save_history()
+        return self._count
+
+    def close(self) -> None:
+        """Insert any buffered entries and close the database."""
+        super().close()
+        if self._connection is None:
+            return
+        self.save_history()
+        self._connection.close()
+        self._connection = None
+
+    def _query(self, sql: str, parameters: tuple = ()) -> List[CalculationEntry]:
+        """Run a query (after inserting buffered entries) and build entries."""
+        self.save_history()
+        try:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading history: {e}")
+            return []
+        return [
+            CalculationEntry.from_iso(expression, result, timestamp)
+            for expression, result, timestamp in rows
+        ]
@@ -0,0 +1,187 @@
+"""
+Table Evaluator Service - evaluates one expression over many variable values.
+Following Single Responsibility Principle - only handles vectorized sweeps.
+"""
+from typing import List, Optional, Tuple
+from models.expression_node import ExpressionNode, NumberNode, UnaryOpNode, VariableNode
+from services.expression_evaluator import ExpressionEvaluator, InvalidExpressionError
+from utils.formatters import ExpressionValidator, NumberFormatter
+
+# NumPy is only needed for the table mode, so it is imported on first use
+np = None
+
+DIVISION_BY_ZERO_MESSAGE = "Divisão por zero!"
+
+
+def _load_numpy() -> None:
+    """Import NumPy into the module namespace the first time it is needed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("O modo tabela requer o NumPy (pip install numpy)") from None
+        np = numpy
+
+
+class TableEvaluator:
+    """Compiles an expression with a variable once and sweeps it with NumPy."""
+
+    def __init__(self, expression: str, variable: str = 'x',
+                 evaluator: Optional[ExpressionEvaluator] = None):
+        """
+        Parse and validate the expression once.
+
+        Args:
+            expression: Expression using the variable (e.g. "x*1.075+3")
+            variable: Name of the variable swept by the table
+            evaluator: Evaluator used to parse the expression
+
+        Raises:
+            ImportError: If NumPy is not installed
+            InvalidExpressionError: If the expression is not valid
+            ValueError: If a literal does not fit in a float (results that
+                overflow while sweeping become inf instead, as in NumPy)
+        """
+        _load_numpy()
+
+        self.expression = expression
+        self.variable = variable
+        evaluator = evaluator or ExpressionEvaluator()
+        self._tree = evaluator.parse(
+            ExpressionValidator.sanitize_expression(expression), variable
+        )
+        self._check_literals(self._tree)
+
+    def evaluate(self, values) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Evaluate the expression for every value in a single vectorized pass.
+
+        Args:
+            values: Array-like of variable values
+
+        Returns:
+            Tuple of the float results and a boolean mask of the elements
+            that divided by zero (their result is meaningless)
+        """
+        values = np.asarray(values, dtype=float)
+        errors = np.zeros(values.shape, dtype=bool)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            results = self._evaluate_tree(self._tree, values, errors)
+
+        results = np.broadcast_to(np.asarray(results, dtype=float), values.shape)
+        return results, errors
+
+    def evaluate_range(self, start: float, stop: float,
+                       step: float = 1.0) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Evaluate the expression over an inclusive range of values.
+
+        Args:
+            start: First value
+            stop: Last value (included when reached by the step)
+            step: Increment between values
+
+        Returns:
+            Tuple of the swept values, the results and the error mask
+        """
+        values = self.build_range(start, stop, step)
+        results, errors = self.evaluate(values)
+        return values, results, errors
+
+    def evaluate_formatted(self, values) -> "np.ndarray":
+        """
+        Evaluate the expression and format every result for display.
+
+        Args:
+            values: Array-like of variable values
+
+        Returns:
+            Object array of formatted results, with an error message in
+            place of the elements that divided by zero
+        """
+        results, errors = self.evaluate(values)
+        formatted = NumberFormatter.format_results(results)
+        formatted[errors] = DIVISION_BY_ZERO_MESSAGE
+        return formatted
+
+    @staticmethod
+    def build_range(start: float, stop: float, step: float = 1.0) -> "np.ndarray":
+        """
+        Build an inclusive range of values from a start, stop and step.
+
+        Raises:
+            ValueError: If the step is zero or points away from stop
+        """
+        _load_numpy()
+        if step == 0 or (stop - start) / step < 0:
+            raise ValueError("Intervalo inválido")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return start + step * np.arange(count, dtype=float)
+
+    @staticmethod
+    def _check_literals(node: ExpressionNode) -> None:
+        """Reject literals too large for a float, which the sweep computes in."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, NumberNode):
+                try:
+                    float(current.value)
+                except OverflowError:
+                    raise ValueError("Número grande demais para o modo tabela") from None
+            elif isinstance(current, UnaryOpNode):
+                stack.append(current.operand)
+            elif not isinstance(current, VariableNode):
+                stack.append(current.left)
+                stack.append(current.right)
+
+    def _evaluate_tree(self, node: ExpressionNode, values: "np.ndarray",
+                       errors: "np.ndarray"):
+        """Walk the tree with arrays, flagging zero divisors in the error mask."""
+        results: List = []
+        stack: List[Tuple[ExpressionNode, bool]] = [(node, False)]
+
+        while stack:
+            current, children_done = stack.pop()
+            if isinstance(current, NumberNode):
+                results.append(float(current.value))
+            elif isinstance(current, VariableNode):
+                results.append(values)
+            elif children_done:
+                if isinstance(current, UnaryOpNode):
+                    operand = results.pop()
+                    results.append(-operand if current.operator == '-' else operand)
+                else:
+                    right = results.pop()
+                    left = results.pop()
+                    results.append(self._apply(current.operator, left, right, errors))
+            else:
+                stack.append((current, True))
+                if isinstance(current, UnaryOpNode):
+                    stack.append((current.operand, False))
+                else:
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+
+        return results[0]
+
+    @staticmethod
+    def _apply(symbol: str, left, right, errors: "np.ndarray"):
+        """Apply a binary operator element-wise, recording zero divisions."""
+        if symbol in ('/', '//'):
+            errors |= np.broadcast_to(np.asarray(right) == 0, errors.shape)
+            return np.true_divide(left, right) if symbol == '/' else np.floor_divide(left, right)
+        if symbol == '**':
+            # 0 ** negative raises ZeroDivisionError in Python
+            zero_base = (np.asarray(left) == 0) & (np.asarray(right) < 0)
+            errors |= np.broadcast_to(zero_base, errors.shape)
+            return np.power(left, right)
+        if symbol == '+':
+            return np.add(left, right)
+        if symbol == '-':
+            return np.subtract(left, right)
+        if symbol == '*':
+            return np.multiply(left, right)
+        raise InvalidExpressionError(f"Símbolo inesperado: {symbol}")
@@ -4,32 +4,42 @@ Following Single Responsibility Principle - only manages history window UI.
 """
 from tkinter import *
 from tkinter import ttk, messagebox
-from typing import List, Callable, Optional
+from typing import Callable, List, Optional, Sequence
 from models.calculation_entry import CalculationEntry
+from ui.virtual_listbox import VirtualListbox
+
+# Delay after the last keystroke before the search runs
+SEARCH_DELAY_MS = 150
 
 
 class HistoryWindow:
     """Manages the history window interface."""
     
-    def __init__(self, parent: Tk, history_entries: List[CalculationEntry], 
+    def __init__(self, parent: Tk, history_entries: Sequence[CalculationEntry], 
                  on_select_callback: Optional[Callable[[str], None]] = None,
-                 on_clear_callback: Optional[Callable[[], None]] = None):
+                 on_clear_callback: Optional[Callable[[], None]] = None,
+                 on_search_callback: Optional[Callable[[str], Sequence[CalculationEntry]]] = None):
         """
         Initialize the history window.
         
         Args:
             parent: Parent window
-            history_entries: List of calculation entries to display
+            history_entries: Calculation entries to display (may be a read-only view)
             on_select_callback: Callback when a history item is selected
             on_clear_callback: Callback when clear history is requested
+            on_search_callback: Indexed search over the same entries (a linear
+                scan of history_entries is used when not provided)
         """
         self.parent = parent
         self.history_entries = history_entries
         self.on_select_callback = on_select_callback
         self.on_clear_callback = on_clear_callback
+        self.on_search_callback = on_search_callback
         self.window = None
         self.search_var = StringVar()
-        self.filtered_entries = history_entries.copy()
+        self.filtered_entries = history_entries
+        self._search_job = None
+        self._last_query = ""
         
     def show(self) -> None:
         """Display the history window."""
@@ -94,7 +104,7 @@ class HistoryWindow:
             relief='solid'
         )
         search_entry.pack(side=LEFT, fill=X, expand=True, padx=(5, 0))
-        search_entry.bind('<KeyRelease>', self._on_search)
+        search_entry.bind('<KeyRelease>', self._schedule_search)
         
         # Buttons frame
         buttons_frame = Frame(self.window, bg='#1e1e1e')
@@ -122,17 +132,9 @@ class HistoryWindow:
             cursor='hand2'
         ).pack(side=LEFT, padx=(5, 0))
         
-        # History listbox with scrollbar
-        list_frame = Frame(self.window, bg='#1e1e1e')
-        list_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
-        
-        # Create listbox with scrollbar
-        scrollbar = Scrollbar(list_frame)
-        scrollbar.pack(side=RIGHT, fill=Y)
-        
-        self.history_listbox = Listbox(
-            list_frame,
-            yscrollcommand=scrollbar.set,
+        # History list: only the rows in view are rendered
+        self.history_list = VirtualListbox(
+            self.window,
             font=('Consolas', 10),
             bg='#2d2d2d',
             fg='#ffffff',
@@ -142,10 +144,8 @@ class HistoryWindow:
             relief='flat',
             activestyle='none'
         )
-        self.history_listbox.pack(side=LEFT, fill=BOTH, expand=True)
-        self.history_listbox.bind('<Double-Button-1>', self._on_item_double_click)
-        
-        scrollbar.config(command=self.history_listbox.yview)
+        self.history_list.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.history_list.bind_row('<Double-Button-1>', self._on_item_double_click)
         
         # Info label
         self.info_label = Label(
@@ -158,54 +158,85 @@ class HistoryWindow:
         self.info_label.pack(pady=5)
     
     def _populate_history(self) -> None:
-        """Populate the history listbox with entries."""
-        self.history_listbox.delete(0, END)
-        
+        """Show the filtered entries; rows are formatted only when scrolled into view."""
         if not self.filtered_entries:
-            self.history_listbox.insert(END, "Nenhum cálculo encontrado")
+            self.history_list.set_rows(1, lambda index: "Nenhum cálculo encontrado")
             self.info_label.config(text="Histórico vazio")
             return
         
-        # Show most recent first
-        for entry in reversed(self.filtered_entries):
-            time_str = entry.get_formatted_time()
-            display_text = f"[{time_str}] {entry.expression} = {entry.result}"
-            self.history_listbox.insert(END, display_text)
-        
         count = len(self.filtered_entries)
+        self.history_list.set_rows(count, self._format_row_at)
         self.info_label.config(
             text=f"{count} cálculo(s) encontrado(s). Duplo clique para usar o resultado."
         )
     
+    def _entry_at(self, row: int) -> CalculationEntry:
+        """Get the entry shown at a row (most recent first)."""
+        return self.filtered_entries[len(self.filtered_entries) - 1 - row]
+    
+    def _format_row_at(self, row: int) -> str:
+        """Format the entry shown at a row."""
+        return self._format_row(self._entry_at(row))
+    
+    @staticmethod
+    def _format_row(entry: CalculationEntry) -> str:
+        """Format an entry as a listbox row."""
+        return f"[{entry.get_formatted_time()}] {entry.expression} = {entry.result}"
+    
+    def _schedule_search(self, event=None) -> None:
+        """Debounce search input so a burst of keystrokes runs a single search."""
+        if self._search_job is not None:
+            self.window.after_cancel(self._search_job)
+        self._search_job = self.window.after(SEARCH_DELAY_MS, self._on_search)
+    
     def _on_search(self, event=None) -> None:
         """Handle search input."""
+        self._search_job = None
+        if not self.window or not self.window.winfo_exists():
+            return
+        
         query = self.search_var.get().strip()
+        query_lower = query.lower()
         
         if not query:
-            self.filtered_entries = self.history_entries.copy()
+            self.filtered_entries = self.history_entries
+        elif self._last_query and self._last_query in query_lower:
+            # Anything matching the longer query matched the previous one too,
+            # so only the previous results need to be filtered again
+            self.filtered_entries = self._filter_entries(self.filtered_entries, query_lower)
+        elif self.on_search_callback and self.history_entries:
+            self.filtered_entries = self.on_search_callback(query)
         else:
-            query_lower = query.lower()
-            self.filtered_entries = [
-                entry for entry in self.history_entries
-                if (query_lower in entry.expression.lower() or 
-                    query_lower in entry.result.lower())
-            ]
+            self.filtered_entries = self._filter_entries(self.history_entries, query_lower)
         
+        self._last_query = query_lower
         self._populate_history()
     
+    @staticmethod
+    def _filter_entries(entries: Sequence[CalculationEntry],
+                        query_lower: str) -> List[CalculationEntry]:
+        """Linear substring filter over expressions and results."""
+        return [
+            entry for entry in entries
+            if (query_lower in entry.expression.lower() or 
+                query_lower in entry.result.lower())
+        ]
+    
     def _on_item_double_click(self, event=None) -> None:
         """Handle double-click on history item."""
-        selection = self.history_listbox.curselection()
-        if not selection or not self.filtered_entries:
+        row = self.history_list.get_selected_index()
+        if row is None or not self.filtered_entries:
             return
         
-        # Get the selected entry (reverse index since we show most recent first)
-        index = len(self.filtered_entries) - 1 - selection[0]
-        selected_entry = self.filtered_entries[index]
+        # The row is absolute, so it maps to an entry wherever the list is scrolled
+        selected_entry = self._entry_at(row)
         
         if self.on_select_callback:
             self.on_select_callback(selected_entry.result)
         
+        if self._search_job is not None:
+            self.window.after_cancel(self._search_job)
+            self._search_job = None
         self.window.destroy()
     
     def _clear_history(self) -> None:
@@ -222,17 +253,19 @@ class HistoryWindow:
         
         if result and self.on_clear_callback:
             self.on_clear_callback()
-            self.history_entries.clear()
-            self.filtered_entries.clear()
+            self.history_entries = []
+            self.filtered_entries = []
+            self._last_query = ""
             self._populate_history()
     
     def _refresh_history(self) -> None:
         """Refresh the history display."""
         self.search_var.set("")
-        self.filtered_entries = self.history_entries.copy()
+        self.filtered_entries = self.history_entries
+        self._last_query = ""
         self._populate_history()
     
-    def update_history(self, new_entries: List[CalculationEntry]) -> None:
+    def update_history(self, new_entries: Sequence[CalculationEntry]) -> None:
         """Update the history entries and refresh display."""
         self.history_entries = new_entries
         self._refresh_history()
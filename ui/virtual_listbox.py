@@ -0,0 +1,139 @@
+"""
+Virtual Listbox UI Component - a list that only renders the visible rows.
+Following Single Responsibility Principle - only handles virtualized rendering.
+"""
+from tkinter import *
+from tkinter import font
+from typing import Callable, Optional
+
+
+class VirtualListbox(Frame):
+    """
+    Scrollable list that renders only the rows in view (plus an overscan).
+
+    Rows are identified by their index and formatted on demand by a
+    callback, so memory and redraw time do not depend on the row count.
+    """
+
+    def __init__(self, parent, overscan: int = 5, **listbox_options):
+        """
+        Initialize the virtual listbox.
+
+        Args:
+            parent: Parent widget
+            overscan: Extra rows rendered below the visible window
+            **listbox_options: Styling options passed to the inner Listbox
+        """
+        super().__init__(parent, bg=listbox_options.get('bg', '#1e1e1e'))
+        self.overscan = overscan
+        self._row_count = 0
+        self._format_row: Callable[[int], str] = str
+        self._top = 0              # Index of the first rendered row
+        self._visible_rows = 1
+        self._selected: Optional[int] = None
+
+        self._scrollbar = Scrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side=RIGHT, fill=Y)
+
+        self._listbox = Listbox(self, exportselection=False, **listbox_options)
+        self._listbox.pack(side=LEFT, fill=BOTH, expand=True)
+        self._line_height = max(1, font.Font(font=self._listbox.cget('font')).metrics('linespace'))
+
+        self._listbox.bind('<Configure>', self._on_resize)
+        self._listbox.bind('<<ListboxSelect>>', self._on_select)
+        self._listbox.bind('<MouseWheel>', self._on_mouse_wheel)
+        self._listbox.bind('<Button-4>', lambda event: self._scroll_rows(-3))
+        self._listbox.bind('<Button-5>', lambda event: self._scroll_rows(3))
+        self._listbox.bind('<Up>', lambda event: self._move_selection(-1))
+        self._listbox.bind('<Down>', lambda event: self._move_selection(1))
+
+    def set_rows(self, row_count: int, format_row: Callable[[int], str]) -> None:
+        """
+        Replace the rows and scroll back to the top.
+
+        Args:
+            row_count: Number of rows
+            format_row: Returns the text of the row at a given index
+        """
+        self._row_count = row_count
+        self._format_row = format_row
+        self._top = 0
+        self._selected = None
+        self._render()
+
+    def get_selected_index(self) -> Optional[int]:
+        """Get the index of the selected row, if any."""
+        return self._selected
+
+    def bind_row(self, sequence: str, callback: Callable) -> None:
+        """Bind an event (e.g. '<Double-Button-1>') on the rows."""
+        self._listbox.bind(sequence, callback)
+
+    def _render(self) -> None:
+        """Draw the rows from the top of the window down to the overscan."""
+        last = min(self._row_count, self._top + self._visible_rows + self.overscan)
+        self._listbox.delete(0, END)
+        if last > self._top:
+            self._listbox.insert(END, *(self._format_row(index) for index in range(self._top, last)))
+
+        if self._selected is not None and self._top <= self._selected < last:
+            self._listbox.selection_set(self._selected - self._top)
+
+        if self._row_count:
+            self._scrollbar.set(
+                self._top / self._row_count,
+                min(1.0, (self._top + self._visible_rows) / self._row_count)
+            )
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, top: int) -> None:
+        """Move the window so that `top` is the first row, then redraw."""
+        top = max(0, min(top, self._row_count - self._visible_rows))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _scroll_rows(self, delta: int) -> str:
+        """Scroll by a number of rows (also used as a wheel handler)."""
+        self._scroll_to(self._top + delta)
+        return 'break'
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        """Translate Scrollbar commands ('moveto'/'scroll') into row offsets."""
+        if action == 'moveto':
+            self._scroll_to(int(float(amount) * self._row_count))
+        elif action == 'scroll':
+            step = self._visible_rows if unit == 'pages' else 1
+            self._scroll_to(self._top + int(amount) * step)
+
+    def _on_mouse_wheel(self, event) -> str:
+        """Scroll three rows per wheel notch (Windows/macOS)."""
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event) -> None:
+        """Recompute how many rows fit and redraw."""
+        visible_rows = max(1, event.height // self._line_height)
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            self._top = max(0, min(self._top, self._row_count - visible_rows))
+            self._render()
+
+    def _on_select(self, event=None) -> None:
+        """Remember the selection as an absolute row index."""
+        selection = self._listbox.curselection()
+        if selection:
+            self._selected = self._top + selection[0]
+
+    def _move_selection(self, delta: int) -> str:
+        """Move the selection with the arrow keys, scrolling when needed."""
+        if not self._row_count:
+            return 'break'
+        current = self._selected if self._selected is not None else self._top - delta
+        self._selected = max(0, min(self._row_count - 1, current + delta))
+        if self._selected < self._top:
+            self._top = self._selected
+        elif self._selected >= self._top + self._visible_rows:
+            self._top = self._selected - self._visible_rows + 1
+        self._render()
+        return 'break'
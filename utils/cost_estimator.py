@@ -0,0 +1,312 @@
+"""
+Cost estimator - predicts the size and work of an expression before evaluating it.
+Following Single Responsibility Principle - only estimates and limits evaluation costs.
+"""
+import math
+from fractions import Fraction
+from typing import List, Tuple
+from models.expression_node import ExpressionNode, NumberNode, UnaryOpNode, VariableNode
+
+DEFAULT_MAX_DIGITS = 1_000_000
+DEFAULT_MAX_WORK = 1e9
+
+# Expressions without ** up to this length fit the default budget whatever
+# they compute, so they are never estimated (see is_trivially_cheap)
+TRIVIAL_LENGTH = 100_000
+
+# What a value is at run time: ints and fractions grow without bound,
+# floats and Decimals (rounded to a precision) do not
+_INT, _FRACTION, _BOUNDED = 0, 1, 2
+
+_LOG10_2 = math.log10(2)
+# Longest int printed in full (the interpreter's int to str limit)
+_FULL_INT_DIGITS = 4300
+# Digits of a float converted to an exact fraction (denominators up to 2 ** 1074)
+_FLOAT_FRACTION_MAGNITUDE = 1074 * _LOG10_2
+# CPython ints are stored in 30-bit limbs of about 9 decimal digits
+_DIGITS_PER_LIMB = 30 * _LOG10_2
+
+# Work units are roughly nanoseconds of big-integer arithmetic on CPython
+_MULTIPLY_COST = 6.0   # Karatsuba: big * small ** 0.585 limbs
+_POWER_COST = 3.0      # repeated squaring: result ** 1.585 limbs
+_DIVIDE_COST = 1.0     # long division: left * right limbs
+_GCD_COST = 2.0        # fraction normalization: limbs ** 2
+_CONVERT_COST = 2.0    # int to Decimal conversion: limbs ** 2
+
+# (kind, log10 upper bound of the magnitude, sign: 1 for >= 0, -1 for <= 0, 0 unknown)
+_Estimate = Tuple[int, float, int]
+
+
+class ExpressionTooCostlyError(ValueError):
+    """Raised when an expression would exceed the evaluation budget."""
+
+
+class CostEstimate:
+    """Predicted cost of evaluating an expression tree."""
+
+    def __init__(self, digits: float, work: float, nodes: int):
+        """
+        Initialize a cost estimate.
+
+        Args:
+            digits: Upper bound of the digits of the largest exact intermediate
+                value (numerator or denominator for fractions)
+            work: Estimated arithmetic work, in units of roughly one nanosecond
+            nodes: Number of nodes of the tree
+        """
+        self.digits = digits
+        self.work = work
+        self.nodes = nodes
+
+    def __repr__(self) -> str:
+        return f"CostEstimate(digits={self.digits:.4g}, work={self.work:.4g}, nodes={self.nodes})"
+
+
+def _limbs(magnitude: float) -> float:
+    """Number of 30-bit limbs of a value with the given log10 magnitude."""
+    return magnitude / _DIGITS_PER_LIMB + 1
+
+
+def _grow(limbs: float, exponent: float) -> float:
+    """limbs ** exponent, saturating at infinity instead of overflowing."""
+    try:
+        return limbs ** exponent
+    except OverflowError:
+        return math.inf
+
+
+def _log10(value: int) -> float:
+    """log10 of a non-negative int (0 for 0), without converting it to a string."""
+    return math.log10(value) if value else 0.0
+
+
+def _literal_estimate(value) -> _Estimate:
+    """Estimate of a literal, from its parsed value."""
+    sign = 1 if value >= 0 else -1
+    if type(value) is int:
+        return _INT, _log10(abs(value)), sign
+    if isinstance(value, Fraction):
+        return _FRACTION, _log10(max(abs(value.numerator), value.denominator)), sign
+    return _BOUNDED, 0.0, sign
+
+
+def _add_sign(left: int, right: int) -> int:
+    """Sign of a sum, when it is known."""
+    return left if left == right else 0
+
+
+def _multiply_sign(left: int, right: int) -> int:
+    """Sign of a product or quotient, when it is known."""
+    return left * right
+
+
+class CostEstimator:
+    """
+    Predicts the digits and work of an expression from its parsed tree.
+
+    The estimate is an upper bound computed from the literals alone, so it
+    never runs the arithmetic it is guarding: 9**9**9 is rejected at once
+    instead of building a 370-million-digit integer.
+    """
+
+    def __init__(self, exact_fractions: bool = False, decimal: bool = False,
+                 max_digits: float = DEFAULT_MAX_DIGITS, max_work: float = DEFAULT_MAX_WORK):
+        """
+        Initialize the estimator.
+
+        Args:
+            exact_fractions: Whether division, decimal literals and negative
+                powers give exact fractions (the 'fraction' arithmetic mode)
+                instead of floats or Decimals
+            decimal: Whether they give Decimals (the 'decimal' arithmetic
+                mode), which convert big ints in quadratic time
+            max_digits: Largest exact intermediate result accepted, in digits
+            max_work: Largest estimated work accepted (about 1e9 per second)
+        """
+        self.exact_fractions = exact_fractions
+        self.decimal = decimal
+        self.max_digits = max_digits
+        self.max_work = max_work
+        # Without **, digits grow by at most one per character (plus carries)
+        # and the work at most quadratically with the length
+        self._trivial_length = min(
+            max_digits / 2, TRIVIAL_LENGTH * math.sqrt(max_work / DEFAULT_MAX_WORK)
+        )
+
+    def is_trivially_cheap(self, normalized_expression: str) -> bool:
+        """
+        Check whether an expression is cheap without parsing it.
+
+        Without ** no intermediate value has many more digits than the
+        expression has characters, so short enough expressions need no
+        estimate. Fractions are always estimated: their gcds make long
+        chains costly.
+
+        Args:
+            normalized_expression: Expression from ExpressionValidator.normalize_tokens
+
+        Returns:
+            True if the expression cannot exceed the budget
+        """
+        return (not self.exact_fractions and '**' not in normalized_expression
+                and len(normalized_expression) <= self._trivial_length)
+
+    def estimate(self, node: ExpressionNode) -> CostEstimate:
+        """
+        Estimate the cost of evaluating an expression tree.
+
+        Args:
+            node: Root node of the (unfolded) expression tree
+
+        Returns:
+            The cost estimate
+        """
+        estimates: List[_Estimate] = []
+        stack: List[Tuple[ExpressionNode, bool]] = [(node, False)]
+        largest = 0.0
+        work = 0.0
+        nodes = 0
+
+        while stack:
+            current, children_done = stack.pop()
+            node_type = type(current)
+            if node_type is NumberNode:
+                estimate = _literal_estimate(current.value)
+            elif node_type is VariableNode:
+                # Variable values are floats supplied at evaluation time
+                estimate = (_BOUNDED, 0.0, 0)
+            elif children_done:
+                if node_type is UnaryOpNode:
+                    kind, magnitude, sign = estimates.pop()
+                    estimate = (kind, magnitude, -sign if current.operator == '-' else sign)
+                    work += 1.0
+                else:
+                    right = estimates.pop()
+                    estimate, operation_work = self._estimate_binary(
+                        current.operator, estimates.pop(), right
+                    )
+                    work += operation_work
+            else:
+                stack.append((current, True))
+                if node_type is UnaryOpNode:
+                    stack.append((current.operand, False))
+                else:
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+                continue
+            nodes += 1
+            if estimate[0] != _BOUNDED and estimate[1] > largest:
+                largest = estimate[1]
+            estimates.append(estimate)
+
+        kind, magnitude, _ = estimates[0]
+        if kind == _FRACTION:
+            # Fractions are displayed through a Decimal division
+            work += _CONVERT_COST * _grow(_limbs(magnitude), 2)
+        elif kind == _INT and magnitude > _FULL_INT_DIGITS:
+            # Too long for str(): the leading digits need a power of ten as large
+            work += _POWER_COST * _grow(_limbs(magnitude), 1.585)
+        # The margin covers the rounding of the float logarithms (10**991 has 992 digits)
+        largest = largest * (1 + 1e-9) + 1e-6
+        digits = math.floor(largest) + 1 if largest < math.inf else math.inf
+        return CostEstimate(digits, work, nodes)
+
+    def check(self, node: ExpressionNode) -> CostEstimate:
+        """
+        Estimate the cost of an expression tree and enforce the budget.
+
+        Args:
+            node: Root node of the (unfolded) expression tree
+
+        Returns:
+            The cost estimate
+
+        Raises:
+            ExpressionTooCostlyError: If the estimate exceeds the budget
+        """
+        estimate = self.estimate(node)
+        if estimate.digits > self.max_digits:
+            digits = f"cerca de {estimate.digits}" if estimate.digits < math.inf else "mais de 10^300"
+            raise ExpressionTooCostlyError(
+                f"Resultado grande demais: {digits} dígitos (limite: {self.max_digits})"
+            )
+        if estimate.work > self.max_work:
+            raise ExpressionTooCostlyError(
+                f"Cálculo grande demais: custo estimado {estimate.work:.3g} "
+                f"(limite: {self.max_work:.3g})"
+            )
+        return estimate
+
+    def _estimate_binary(self, symbol: str, left: _Estimate,
+                         right: _Estimate) -> Tuple[_Estimate, float]:
+        """Estimate the result and the work of a binary operation."""
+        left_kind, left_magnitude, left_sign = left
+        right_kind, right_magnitude, right_sign = right
+        kind = max(left_kind, right_kind)
+        if symbol in ('+', '-'):
+            sign = _add_sign(left_sign, -right_sign if symbol == '-' else right_sign)
+        elif symbol == '**':
+            sign = 1 if left_sign == 1 else 0
+        else:
+            sign = _multiply_sign(left_sign, right_sign)
+
+        if symbol == '**':
+            return self._estimate_power(left, right, sign)
+
+        if symbol == '/':
+            if not self.exact_fractions or right_kind == _BOUNDED:
+                # True division gives a float or Decimal after one long division
+                work = _limbs(left_magnitude) + _limbs(right_magnitude)
+                return (_BOUNDED, 0.0, sign), work + self._conversion_work(left, right)
+            if left_kind == _BOUNDED:
+                # Fraction(left) / right turns even a float dividend into a fraction
+                left_magnitude = _FLOAT_FRACTION_MAGNITUDE
+            kind = _FRACTION
+
+        if kind == _BOUNDED:
+            return (_BOUNDED, 0.0, sign), 1.0 + self._conversion_work(left, right)
+
+        if kind == _FRACTION:
+            # Fractions cross-multiply, then reduce by the gcd
+            magnitude = left_magnitude + right_magnitude + _LOG10_2
+            return (_FRACTION, magnitude, sign), _GCD_COST * _grow(_limbs(magnitude), 2)
+
+        big = max(_limbs(left_magnitude), _limbs(right_magnitude))
+        small = min(_limbs(left_magnitude), _limbs(right_magnitude))
+        if symbol in ('+', '-'):
+            return (_INT, max(left_magnitude, right_magnitude) + _LOG10_2, sign), big
+        if symbol == '*':
+            return (_INT, left_magnitude + right_magnitude, sign), _MULTIPLY_COST * big * _grow(small, 0.585)
+        # Floor division: the quotient is no larger than the dividend
+        return (_INT, left_magnitude, sign), _DIVIDE_COST * big * small
+
+    def _estimate_power(self, base: _Estimate, exponent: _Estimate,
+                        sign: int) -> Tuple[_Estimate, float]:
+        """Estimate the result and the work of base ** exponent."""
+        base_kind, base_magnitude, _ = base
+        exponent_kind, exponent_magnitude, exponent_sign = exponent
+        if base_kind == _BOUNDED or exponent_kind == _BOUNDED:
+            # Float/Decimal powers overflow or round instead of growing
+            return (_BOUNDED, 0.0, sign), 1.0 + self._conversion_work(base, exponent)
+        if exponent_sign == -1 and not self.exact_fractions:
+            # A negative exponent gives a float or Decimal; a zero one gives 1
+            return (_INT, 0.0, sign), 1.0 + self._conversion_work(base, exponent)
+        if base_magnitude <= 0:
+            # |base| <= 1: the result stays 0, 1 or -1
+            return (base_kind, 0.0, sign), _limbs(exponent_magnitude)
+
+        exponent_bound = 10.0 ** exponent_magnitude if exponent_magnitude < 300 else math.inf
+        magnitude = base_magnitude * exponent_bound
+        kind = _FRACTION if exponent_sign != 1 and self.exact_fractions else base_kind
+        if exponent_kind == _FRACTION:
+            # A fractional exponent gives a float, which a division can turn
+            # back into an exact fraction
+            magnitude = max(magnitude, _FLOAT_FRACTION_MAGNITUDE)
+        return (kind, magnitude, sign), _POWER_COST * _grow(_limbs(magnitude), 1.585)
+
+    def _conversion_work(self, *operands: _Estimate) -> float:
+        """Work of converting the int operands of a Decimal operation."""
+        if not self.decimal:
+            return 0.0
+        return sum(_CONVERT_COST * _grow(_limbs(magnitude), 2)
+                   for kind, magnitude, _ in operands if kind == _INT)
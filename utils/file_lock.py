@@ -0,0 +1,58 @@
+"""
+Inter-process file lock - serializes the writers of a file shared by several processes.
+Following Single Responsibility Principle - only handles advisory file locking.
+"""
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within this process
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive advisory lock (fcntl.flock) guarding a shared file.
+
+    The lock is taken on a separate '<path>.lock' file, so the guarded file
+    itself can be replaced atomically (os.replace) while the lock is held.
+    Every process that writes the file must use the lock; readers do not
+    need it when writers only ever replace the file or append to it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock (nothing is opened until it is acquired).
+
+        Args:
+            path: Path of the guarded file
+        """
+        self.lock_path = f"{path}.lock"
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> 'FileLock':
+        """Block until this thread holds the lock, in this and every other process."""
+        self._thread_lock.acquire()
+        try:
+            if fcntl is not None:
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Release the lock."""
+        if self._fd is not None:
+            os.close(self._fd)  # closing the descriptor releases the flock
+            self._fd = None
+        self._thread_lock.release()
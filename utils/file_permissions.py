@@ -0,0 +1,39 @@
+"""
+File permissions - gives files written through a temporary file the mode a direct write would.
+Following Single Responsibility Principle - only decides and applies file modes.
+"""
+import os
+import stat
+
+
+def _read_umask() -> int:
+    """Get the process umask (it can only be read by setting it)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once, at import: setting it later could race with other threads creating files
+_UMASK = _read_umask()
+
+
+def match_replaced_mode(fd: int, path: str) -> None:
+    """
+    Give a temporary file the permissions of the file it will replace.
+
+    tempfile.mkstemp creates files readable by their owner only, and a file
+    renamed over `path` keeps that mode. It gets the mode of the existing
+    file instead or, for a new file, the one open() would give it (0o666
+    less the umask).
+
+    Args:
+        fd: Descriptor of the temporary file
+        path: Path of the file it will replace
+    """
+    if not hasattr(os, 'fchmod'):  # Windows: mkstemp's mode does not restrict reading
+        return
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.fchmod(fd, mode)
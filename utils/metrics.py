@@ -0,0 +1,295 @@
+"""
+Metrics - per-stage latency histograms and counters of the calculation pipeline.
+Following Single Responsibility Principle - only records and exports metrics.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+from utils.file_permissions import match_replaced_mode
+
+# Path of the metrics snapshot; metrics are only recorded when it is set.
+# A '.json' path gets JSON, any other the Prometheus text format.
+METRICS_ENV = "CALCULATOR_METRICS"
+
+# Seconds between automatic snapshots (one is also written at exit)
+SAVE_INTERVAL = 10.0
+
+# Upper bounds (seconds) of the histogram buckets: 1 µs to 10 s in 1-2.5-5 steps
+BUCKET_BOUNDS: Tuple[float, ...] = tuple(
+    mantissa * 10.0 ** exponent for exponent in range(-6, 1) for mantissa in (1, 2.5, 5)
+) + (10.0,)
+
+# Counters known in advance, with their descriptions (others may be added)
+COUNTER_HELP = {
+    'evaluations': "Expressions evaluated (result cache misses)",
+    'cache_hits': "Results served from the result cache",
+    'errors': "Failed calculations by error type",
+    'history_bytes_written': "Bytes written to history files"
+}
+
+CounterKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# No-op returned by Metrics.time() while disabled (shared and reusable)
+_NO_TIMER = nullcontext()
+
+
+class _StageTimer:
+    """Context manager that records the time spent in the enclosed block."""
+
+    __slots__ = ('_metrics', '_stage', '_start')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self) -> '_StageTimer':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """
+    Latency histograms per pipeline stage and labelled counters.
+
+    While disabled every method returns right away. Code on hot paths
+    (e.g. the cached result of a calculation) checks `enabled` itself
+    before timing anything, since even a no-op `with` block costs about
+    as much as a cache hit.
+    """
+
+    def __init__(self, enabled: bool = True, output_file: Optional[str] = None,
+                 save_interval: float = SAVE_INTERVAL):
+        """
+        Initialize the metrics.
+
+        Args:
+            enabled: When False, nothing is recorded (no timing overhead)
+            output_file: Where save() writes the snapshot ('.json' for JSON,
+                anything else for the Prometheus text format)
+            save_interval: Seconds between automatic snapshots while recording
+        """
+        self.enabled = enabled
+        self.output_file = output_file
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List] = {}  # stage -> [bucket counts, sum]
+        self._counters: Dict[CounterKey, float] = {}
+        self._next_save = time.monotonic() + save_interval
+
+    @classmethod
+    def from_environment(cls) -> 'Metrics':
+        """Create metrics enabled only when CALCULATOR_METRICS names a snapshot file."""
+        output_file = os.environ.get(METRICS_ENV)
+        metrics = cls(enabled=bool(output_file), output_file=output_file or None)
+        if metrics.enabled:
+            atexit.register(metrics.save)
+        return metrics
+
+    def time(self, stage: str):
+        """
+        Time the enclosed block as one run of a pipeline stage.
+
+        Args:
+            stage: Name of the stage (e.g. 'evaluate')
+
+        Returns:
+            A context manager (a shared no-op while disabled)
+        """
+        if not self.enabled:
+            return _NO_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record one run of a pipeline stage.
+
+        Args:
+            stage: Name of the stage
+            seconds: Time the run took
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = [[0] * (len(BUCKET_BOUNDS) + 1), 0.0]
+            histogram[0][bisect_left(BUCKET_BOUNDS, seconds)] += 1
+            histogram[1] += seconds
+        self._save_if_due()
+
+    def count(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Name of the counter (e.g. 'errors')
+            amount: How much to add
+            **labels: Labels telling the counter's series apart (e.g. type='ZeroDivisionError')
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def take(self) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return everything recorded so far, for merge() in another process.
+
+        Returns:
+            The recorded metrics, or None while disabled
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            recorded = {'stages': self._stages, 'counters': self._counters}
+            self._stages, self._counters = {}, {}
+        return recorded
+
+    def merge(self, recorded: Optional[Dict[str, Any]]) -> None:
+        """
+        Add metrics returned by take() (e.g. in a worker process) to these.
+
+        Args:
+            recorded: The metrics to add (None is ignored)
+        """
+        if not self.enabled or not recorded:
+            return
+        with self._lock:
+            for stage, (counts, total) in recorded['stages'].items():
+                histogram = self._stages.get(stage)
+                if histogram is None:
+                    self._stages[stage] = [list(counts), total]
+                else:
+                    histogram[0] = [mine + theirs for mine, theirs in zip(histogram[0], counts)]
+                    histogram[1] += total
+            for key, value in recorded['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+        self._save_if_due()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._stages, self._counters = {}, {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the metrics recorded so far.
+
+        Returns:
+            Per stage: run count, total seconds and cumulative bucket counts
+            keyed by upper bound; per counter: its series as labels and value
+        """
+        with self._lock:
+            stages = {stage: (list(counts), total) for stage, (counts, total) in self._stages.items()}
+            counters = dict(self._counters)
+
+        snapshot = {'stages': {}, 'counters': {}}
+        for stage, (counts, total) in sorted(stages.items()):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(BUCKET_BOUNDS + (float('inf'),), counts):
+                cumulative += count
+                buckets[_format_bound(bound)] = cumulative
+            snapshot['stages'][stage] = {
+                'count': cumulative,
+                'sum': total,
+                'mean': total / cumulative if cumulative else 0.0,
+                'buckets': buckets
+            }
+        for (name, labels), value in sorted(counters.items()):
+            snapshot['counters'].setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        if snapshot['stages']:
+            lines += [
+                "# HELP calculator_stage_seconds Time spent in each stage of the calculation pipeline",
+                "# TYPE calculator_stage_seconds histogram"
+            ]
+            for stage, histogram in snapshot['stages'].items():
+                stage_label = f'stage="{_escape_label(stage)}"'
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f'calculator_stage_seconds_bucket{{{stage_label},le="{bound}"}} {count}')
+                lines.append(f"calculator_stage_seconds_sum{{{stage_label}}} {histogram['sum']!r}")
+                lines.append(f"calculator_stage_seconds_count{{{stage_label}}} {histogram['count']}")
+        for name, series in snapshot['counters'].items():
+            metric = f"calculator_{name}_total"
+            lines += [
+                f"# HELP {metric} {COUNTER_HELP.get(name, name.replace('_', ' ').capitalize())}",
+                f"# TYPE {metric} counter"
+            ]
+            for entry in series:
+                labels = ",".join(f'{label}="{_escape_label(value)}"'
+                                  for label, value in entry['labels'].items())
+                lines.append(f"{metric}{{{labels}}} {entry['value']}" if labels
+                             else f"{metric} {entry['value']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_json(self) -> str:
+        """Render the metrics as JSON."""
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def save(self, output_file: Optional[str] = None) -> None:
+        """
+        Atomically write a snapshot of the metrics.
+
+        Args:
+            output_file: Where to write it (default: the configured output_file);
+                '.json' for JSON, anything else for the Prometheus text format
+        """
+        output_file = output_file or self.output_file
+        if not self.enabled or not output_file:
+            return
+        text = self.to_json() if output_file.endswith('.json') else self.to_prometheus()
+        directory, name = os.path.split(os.path.abspath(output_file))
+        # Replaced atomically: a scraper never reads a half-written snapshot
+        fd, temp_file = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                match_replaced_mode(f.fileno(), output_file)
+                f.write(text)
+            os.replace(temp_file, output_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def _save_if_due(self) -> None:
+        """Write a snapshot if the save interval has passed since the last one."""
+        now = time.monotonic()
+        if now < self._next_save or not self.output_file:
+            return
+        with self._lock:
+            if now < self._next_save:
+                return
+            self._next_save = now + self.save_interval
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Error saving metrics: {e}")
+
+
+def _format_bound(bound: float) -> str:
+    """Format a bucket upper bound as Prometheus does ('+Inf' for the last)."""
+    return "+Inf" if bound == float('inf') else f"{bound:g}"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by the whole process; enabled by the CALCULATOR_METRICS environment variable
+metrics = Metrics.from_environment()
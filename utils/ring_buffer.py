@@ -0,0 +1,198 @@
+"""
+Fixed-capacity ring buffer with zero-copy read-only views.
+Following Single Responsibility Principle - only stores a bounded sequence.
+"""
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+class RingBuffer:
+    """A bounded FIFO sequence with O(1) append and eviction of the oldest item."""
+
+    def __init__(self, capacity: int, items: Iterable[Any] = ()):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Maximum number of items kept (at least 1)
+            items: Initial items; only the last `capacity` are kept
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._buffer: List[Any] = [None] * capacity
+        self._head = 0   # Physical slot of the oldest item
+        self._size = 0
+        self._first = 0  # Absolute position of the oldest item since creation
+        self.extend(items)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of items kept."""
+        return len(self._buffer)
+
+    def append(self, item: Any) -> Optional[Any]:
+        """
+        Append an item, evicting the oldest one when full.
+
+        Args:
+            item: The item to append
+
+        Returns:
+            The evicted item, or None if nothing was evicted
+        """
+        capacity = len(self._buffer)
+        if self._size < capacity:
+            self._buffer[(self._head + self._size) % capacity] = item
+            self._size += 1
+            return None
+
+        evicted = self._buffer[self._head]
+        self._buffer[self._head] = item
+        self._head = (self._head + 1) % capacity
+        self._first += 1
+        return evicted
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """Append every item of an iterable."""
+        for item in items:
+            self.append(item)
+
+    def remove_newest(self, count: int = 1) -> List[Any]:
+        """
+        Remove the most recent items.
+
+        Args:
+            count: Number of items to remove
+
+        Returns:
+            The removed items, oldest first
+        """
+        count = min(count, self._size)
+        capacity = len(self._buffer)
+        removed = []
+        for offset in range(self._size - count, self._size):
+            slot = (self._head + offset) % capacity
+            removed.append(self._buffer[slot])
+            self._buffer[slot] = None
+        self._size -= count
+        return removed
+
+    def clear(self) -> None:
+        """Remove all items (existing views become empty)."""
+        self._buffer = [None] * len(self._buffer)
+        self._first += self._size
+        self._head = 0
+        self._size = 0
+
+    def resize(self, capacity: int) -> List[Any]:
+        """
+        Change the capacity, evicting the oldest items if it shrinks.
+
+        Args:
+            capacity: New maximum number of items (at least 1)
+
+        Returns:
+            The evicted items, oldest first
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        items = self.to_list()
+        evicted = items[:max(0, len(items) - capacity)]
+        kept = items[len(evicted):]
+
+        self._buffer = kept + [None] * (capacity - len(kept))
+        self._head = 0
+        self._size = len(kept)
+        self._first += len(evicted)
+        return evicted
+
+    def view(self) -> 'RingBufferView':
+        """Get a read-only view of the items currently in the buffer."""
+        return RingBufferView(self, self._first, self._first + self._size)
+
+    def to_list(self) -> List[Any]:
+        """Copy the items, oldest first, into a new list."""
+        end = self._head + self._size
+        if end <= len(self._buffer):
+            return self._buffer[self._head:end]
+        return self._buffer[self._head:] + self._buffer[:end - len(self._buffer)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.view())
+
+    def _get_absolute(self, position: int) -> Any:
+        """Get the item at an absolute position (must still be retained)."""
+        return self._buffer[(self._head + position - self._first) % len(self._buffer)]
+
+
+class RingBufferView(Sequence):
+    """
+    Read-only, zero-copy window over a range of a RingBuffer.
+
+    A view covers the items that were in the buffer when it was taken.
+    Items appended later are not part of it, and items evicted later
+    simply disappear from its front. Items removed from the back with
+    remove_newest disappear from its back, until others are appended in
+    their place.
+    """
+
+    def __init__(self, ring: RingBuffer, start: int, stop: int):
+        """
+        Initialize the view.
+
+        Args:
+            ring: The buffer being viewed
+            start: Absolute position of the first item covered
+            stop: Absolute position just past the last item covered
+        """
+        self._ring = ring
+        self._start = start
+        self._stop = stop
+
+    def _bounds(self):
+        """Current absolute bounds, clamped to the items still retained."""
+        ring = self._ring
+        return max(self._start, ring._first), min(self._stop, ring._first + ring._size)
+
+    def __len__(self) -> int:
+        start, stop = self._bounds()
+        return max(0, stop - start)
+
+    def __getitem__(self, index):
+        start, stop = self._bounds()
+        length = max(0, stop - start)
+
+        if isinstance(index, slice):
+            first, last, step = index.indices(length)
+            if step != 1:
+                return [self[i] for i in range(first, last, step)]
+            return RingBufferView(self._ring, start + first, start + max(first, last))
+
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ring buffer view index out of range")
+        return self._ring._get_absolute(start + index)
+
+    def __iter__(self) -> Iterator[Any]:
+        start, stop = self._bounds()
+        for position in range(start, stop):
+            yield self._ring._get_absolute(position)
+
+    def __reversed__(self) -> Iterator[Any]:
+        start, stop = self._bounds()
+        for position in range(stop - 1, start - 1, -1):
+            yield self._ring._get_absolute(position)
+
+    def copy(self) -> List[Any]:
+        """Copy the viewed items into a new list."""
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"RingBufferView({list(self)!r})"
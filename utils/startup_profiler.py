@@ -0,0 +1,203 @@
+"""
+Startup profiling utilities - import costs and wall-clock startup phases.
+Following Single Responsibility Principle - only measures and reports startup.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Set in the profiled child process: path where it writes its spans
+PROFILE_SPANS_ENV = "CALCULATOR_PROFILE_SPANS"
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$')
+
+
+class StartupProfiler:
+    """Records named wall-clock spans relative to the profiler's creation."""
+
+    def __init__(self, enabled: bool = True, output_file: Optional[str] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: When False, span() does nothing (no timing overhead)
+            output_file: Where save() writes the spans as JSON
+        """
+        self.enabled = enabled
+        self.output_file = output_file
+        self.spans: List[Dict[str, float]] = []
+        self._origin = time.perf_counter()
+        self._origin_epoch = time.time()
+        self._first_window_epoch: Optional[float] = None
+
+    @classmethod
+    def from_environment(cls) -> 'StartupProfiler':
+        """Create a profiler enabled only inside a profiled child process."""
+        output_file = os.environ.get(PROFILE_SPANS_ENV)
+        return cls(enabled=bool(output_file), output_file=output_file)
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block as a named startup phase."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append({
+                'name': name,
+                'start_ms': (start - self._origin) * 1000,
+                'duration_ms': (end - start) * 1000
+            })
+
+    def mark_first_window(self) -> None:
+        """Record that the first frame has been painted (work deferred past it comes later)."""
+        if self.enabled:
+            self._first_window_epoch = time.time()
+
+    def save(self) -> None:
+        """Write the spans, the profiler's start time and the first-paint time to output_file."""
+        if not self.enabled or not self.output_file:
+            return
+        finished_epoch = time.time()
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'origin_epoch': self._origin_epoch,
+                'first_window_epoch': self._first_window_epoch or finished_epoch,
+                'finished_epoch': finished_epoch,
+                'spans': self.spans
+            }, f)
+
+
+def parse_importtime(stderr_text: str) -> List[Dict]:
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+        stderr_text: Standard error of the profiled process
+
+    Returns:
+        One dict per imported module with self/cumulative times in
+        microseconds and the nesting depth
+    """
+    imports = []
+    for line in stderr_text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': len(match.group(3)) // 2
+            })
+    return imports
+
+
+def format_report(report: Dict, top_imports: int = 15) -> str:
+    """
+    Render a startup report as text.
+
+    Args:
+        report: Report built by profile_startup
+        top_imports: Number of most expensive top-level imports listed
+
+    Returns:
+        The human-readable report
+    """
+    lines = [
+        "Perfil de inicialização",
+        "=======================",
+        f"Tempo até a primeira janela: {report['time_to_first_window_ms']:.1f} ms",
+        f"Tempo até carregar tudo (histórico incluído): {report['time_to_fully_loaded_ms']:.1f} ms",
+        f"Importações (total): {report['import_total_ms']:.1f} ms",
+        "",
+        "Fases:",
+    ]
+    for span in report['spans']:
+        lines.append(f"  {span['name']:<32} {span['duration_ms']:>9.2f} ms  (início em {span['start_ms']:.2f} ms)")
+
+    top_level = [entry for entry in report['imports'] if entry['depth'] == 0]
+    top_level.sort(key=lambda entry: entry['cumulative_us'], reverse=True)
+    lines += ["", f"Importações mais caras (nível superior, top {top_imports}):"]
+    for entry in top_level[:top_imports]:
+        lines.append(f"  {entry['module']:<40} {entry['cumulative_us'] / 1000:>9.2f} ms")
+
+    return "\n".join(lines) + "\n"
+
+
+def profile_startup(script: str, output_base: str = "startup_profile",
+                    timeout: float = 60.0) -> int:
+    """
+    Run a script under `-X importtime` and report its startup profile.
+
+    The script is expected to record its phases with a StartupProfiler
+    created by from_environment(), call mark_first_window() once its
+    first frame is painted, save() them and exit once its first
+    window has been drawn.
+
+    Args:
+        script: Path of the script to profile
+        output_base: Report path without extension (.txt and .json are written)
+        timeout: Seconds to wait for the profiled process
+
+    Returns:
+        Exit status (0 on success)
+    """
+    spans_fd, spans_file = tempfile.mkstemp(suffix=".json")
+    os.close(spans_fd)
+    env = dict(os.environ, **{PROFILE_SPANS_ENV: spans_file})
+
+    try:
+        launched_epoch = time.time()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", script],
+            env=env, stderr=subprocess.PIPE, text=True, timeout=timeout
+        )
+        imports = parse_importtime(process.stderr)
+
+        if process.returncode != 0 or os.path.getsize(spans_file) == 0:
+            errors = "\n".join(
+                line for line in process.stderr.splitlines() if not line.startswith("import time:")
+            )
+            print(f"Erro: o processo perfilado falhou (código {process.returncode})\n{errors}",
+                  file=sys.stderr)
+            return 1
+
+        with open(spans_file, 'r', encoding='utf-8') as f:
+            child = json.load(f)
+    except subprocess.TimeoutExpired:
+        print(f"Erro: o processo perfilado não terminou em {timeout:.0f} s", file=sys.stderr)
+        return 1
+    finally:
+        os.remove(spans_file)
+
+    report = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'time_to_first_window_ms': (child['first_window_epoch'] - launched_epoch) * 1000,
+        'time_to_fully_loaded_ms': (child['finished_epoch'] - launched_epoch) * 1000,
+        'interpreter_to_main_ms': (child['origin_epoch'] - launched_epoch) * 1000,
+        'import_total_ms': sum(e['cumulative_us'] for e in imports if e['depth'] == 0) / 1000,
+        'spans': child['spans'],
+        'imports': imports
+    }
+
+    text = format_report(report)
+    with open(f"{output_base}.txt", 'w', encoding='utf-8') as f:
+        f.write(text)
+    with open(f"{output_base}.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(text, end="")
+    print(f"Relatórios salvos em {output_base}.txt e {output_base}.json")
+    return 0